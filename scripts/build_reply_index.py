@@ -0,0 +1,445 @@
+#!/usr/bin/env python3
+"""
+Build a reverse index of replies (in_reply_to_post_id -> blob_name, reply_index) in GCS.
+
+Streams every JSON file of the raw layer once and writes one row per reply to a
+Parquet file (default: indexes/replies_by_parent.parquet in the same bucket).
+Rows are grouped into INDEX_PARTITIONS row groups by a stable hash of
+in_reply_to_post_id, so search_replies_by_post_id.py --use-index only reads the
+row group of the requested post and downloads the few files that hold its replies.
+Rows are spilled to one local file per partition while the bucket is scanned and
+streamed to GCS one row group at a time, so memory is bounded by the largest
+partition rather than by the total number of replies.
+
+The raw layer is append-mostly: with --incremental, rows of files whose generation
+did not change are kept from the previous index and only new or rewritten files
+are downloaded.
+
+If any file fails to index, the index is not uploaded (the previous one stays in place)
+and the script exits non-zero; --force uploads it anyway, keeping the previous rows of
+the failed files so their replies stay searchable until the next build.
+
+Usage:
+    # Build the index for the whole raw layer
+    poetry run python scripts/build_reply_index.py --bucket trust-prd
+
+    # Only download files added or changed since the last build
+    poetry run python scripts/build_reply_index.py --bucket trust-prd --incremental
+
+    # Then query it
+    poetry run python scripts/search_replies_by_post_id.py 3776855243175861385 --use-index
+"""
+
+import argparse
+import json
+import os
+import sys
+import tempfile
+import zlib
+from collections import defaultdict, deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Check for required dependencies
+try:
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.ipc as ipc
+    import pyarrow.parquet as pq
+    from pyarrow import fs as pafs
+except ImportError:
+    print("ERROR: pyarrow is required. Install with: poetry add pyarrow")
+    sys.exit(1)
+
+try:
+    from google.cloud import storage
+except ImportError:
+    print("ERROR: google-cloud-storage is required. Install with: poetry add google-cloud-storage")
+    sys.exit(1)
+
+# Shared helpers of the sibling script, importable from any working directory
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+try:
+    from search_replies_by_post_id import (
+        DEFAULT_CONCURRENCY,
+        UnstreamableLayoutError,
+        get_in_reply_to,
+        ijson,
+        in_reply_to_keys_for,
+        iter_replies,
+        iter_replies_streaming,
+        orjson,
+    )
+except ImportError as e:
+    print(f"ERROR: cannot import search_replies_by_post_id.py: {e}")
+    sys.exit(1)
+
+DEFAULT_INDEX_PATH = "indexes/replies_by_parent.parquet"
+
+# Number of hash partitions (one Parquet row group each) of the index
+INDEX_PARTITIONS = 64
+
+# Rows buffered per partition before they are spilled to its local file
+SPILL_BATCH_ROWS = 10_000
+
+INDEX_SCHEMA = pa.schema(
+    [
+        ("partition", pa.int32()),
+        ("in_reply_to_post_id", pa.string()),
+        ("blob_name", pa.string()),
+        ("generation", pa.int64()),
+        ("reply_index", pa.int32()),
+        ("reply_id", pa.string()),
+    ]
+)
+
+
+def index_partition(post_id: str) -> int:
+    """Return the index partition of a post id (stable across processes, unlike hash())."""
+    return zlib.crc32(post_id.encode()) % INDEX_PARTITIONS
+
+
+def extract_index_rows(blob: storage.Blob) -> list[dict[str, Any]]:
+    """
+    Read one JSON blob and return an index row for each reply with a parent post id.
+
+    With ijson installed the blob is streamed reply by reply, as in search_blob(). A file
+    with no such reply gets a single row with no parent, so --incremental still knows it
+    was indexed at this generation.
+    """
+    if ijson is not None:
+        try:
+            with blob.open("rb") as f:
+                return index_rows(blob, iter_replies_streaming(f))
+        except UnstreamableLayoutError:
+            pass  # Rare layout (single reply object): parse the whole document below
+
+    content = blob.download_as_bytes()
+    data = orjson.loads(content) if orjson is not None else json.loads(content)
+    return index_rows(blob, iter_replies(data))
+
+
+def index_rows(
+    blob: storage.Blob, replies: Iterable[tuple[int, dict[str, Any]]]
+) -> list[dict[str, Any]]:
+    """Return the index rows of a blob from its (index, reply) pairs."""
+    keys = in_reply_to_keys_for(blob.name)
+    rows = []
+    for idx, reply in replies:
+        in_reply_to = get_in_reply_to(reply, keys)
+        if in_reply_to is None:
+            continue
+        in_reply_to = str(in_reply_to)
+        reply_id = reply.get("id_str") or reply.get("id") or reply.get("tweet_id")
+        rows.append(
+            {
+                "partition": index_partition(in_reply_to),
+                "in_reply_to_post_id": in_reply_to,
+                "blob_name": blob.name,
+                "generation": blob.generation,
+                "reply_index": idx,
+                "reply_id": None if reply_id is None else str(reply_id),
+            }
+        )
+    if not rows:
+        rows.append(
+            {
+                "partition": None,
+                "in_reply_to_post_id": None,
+                "blob_name": blob.name,
+                "generation": blob.generation,
+                "reply_index": None,
+                "reply_id": None,
+            }
+        )
+    return rows
+
+
+class PartitionSpool:
+    """
+    Local spill files of index rows, one Arrow IPC file per partition.
+
+    Rows without a parent go in an extra partition (INDEX_PARTITIONS) so they are
+    written last, in a final row group.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.buffers: defaultdict[int, list[dict[str, Any]]] = defaultdict(list)
+        self.writers: dict[int, ipc.RecordBatchFileWriter] = {}
+
+    def path(self, key: int) -> str:
+        return os.path.join(self.directory, f"partition-{key}.arrow")
+
+    def add_rows(self, rows: Iterable[dict[str, Any]]) -> None:
+        for row in rows:
+            key = INDEX_PARTITIONS if row["partition"] is None else row["partition"]
+            buffer = self.buffers[key]
+            buffer.append(row)
+            if len(buffer) >= SPILL_BATCH_ROWS:
+                self.spill(key)
+
+    def spill(self, key: int) -> None:
+        buffer = self.buffers.pop(key, None)
+        if not buffer:
+            return
+        writer = self.writers.get(key)
+        if writer is None:
+            writer = self.writers[key] = ipc.new_file(self.path(key), INDEX_SCHEMA)
+        writer.write_table(pa.Table.from_pylist(buffer, schema=INDEX_SCHEMA))
+
+    def partitions(self) -> Iterator[pa.Table]:
+        """Yield each non-empty partition as a table sorted by in_reply_to_post_id."""
+        for key in range(INDEX_PARTITIONS + 1):
+            self.spill(key)
+            writer = self.writers.pop(key, None)
+            if writer is None:
+                continue
+            writer.close()
+            table = ipc.open_file(pa.memory_map(self.path(key))).read_all()
+            yield table.sort_by("in_reply_to_post_id")
+            os.remove(self.path(key))
+
+
+def iter_index_rows(
+    executor: ThreadPoolExecutor, blobs: Iterable[storage.Blob], max_in_flight: int
+) -> Iterator[tuple[storage.Blob, Future]]:
+    """Submit extract_index_rows for each blob, keeping at most max_in_flight pending."""
+    in_flight: deque[tuple[storage.Blob, Future]] = deque()
+    for blob in blobs:
+        in_flight.append((blob, executor.submit(extract_index_rows, blob)))
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft()
+    while in_flight:
+        yield in_flight.popleft()
+
+
+def index_uri(bucket_name: str, index_path: str) -> str:
+    """Return the bucket-qualified path of the index for pyarrow's GCS filesystem."""
+    return f"{bucket_name}/{index_path}"
+
+
+def open_existing_index(bucket_name: str, index_path: str) -> pq.ParquetFile | None:
+    """Open the current index in GCS, or return None if it does not exist yet."""
+    gcs = pafs.GcsFileSystem()
+    uri = index_uri(bucket_name, index_path)
+    if gcs.get_file_info(uri).type == pafs.FileType.NotFound:
+        return None
+    return pq.ParquetFile(gcs.open_input_file(uri))
+
+
+def lookup_reply_index(bucket_name: str, index_path: str, post_id: str) -> list[str]:
+    """Return the names of the files holding replies to post_id, according to the index."""
+    # The partition filter prunes every row group but one (row group statistics)
+    table = pq.read_table(
+        index_uri(bucket_name, index_path),
+        filesystem=pafs.GcsFileSystem(),
+        columns=["blob_name"],
+        filters=[
+            ("partition", "=", index_partition(post_id)),
+            ("in_reply_to_post_id", "=", post_id),
+        ],
+    )
+    return list(dict.fromkeys(table.column("blob_name").to_pylist()))
+
+
+def write_index(partitions: Iterable[pa.Table], bucket_name: str, index_path: str) -> int:
+    """Stream the index to GCS, one row group per partition, and return its row count."""
+    total_rows = 0
+    gcs = pafs.GcsFileSystem()
+    with gcs.open_output_stream(index_uri(bucket_name, index_path)) as sink:
+        with pq.ParquetWriter(sink, INDEX_SCHEMA, compression="snappy") as writer:
+            for table in partitions:
+                writer.write_table(table, row_group_size=table.num_rows)
+                total_rows += table.num_rows
+    return total_rows
+
+
+def build_reply_index(
+    bucket_name: str,
+    prefix: str = "raw/",
+    index_path: str = DEFAULT_INDEX_PATH,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    incremental: bool = False,
+    dry_run: bool = False,
+    force: bool = False,
+) -> dict[str, Any]:
+    """
+    Scan the raw layer and (re)write the reply index.
+
+    Args:
+        bucket_name: GCS bucket name
+        prefix: Prefix of the JSON files to index (default: "raw/")
+        index_path: Object path of the index in the bucket
+        concurrency: Number of files downloaded in parallel
+        incremental: If True, keep rows of files unchanged since the previous index
+        dry_run: If True, build the index but do not upload it
+        force: If True, upload the index even if some files failed to index (their
+            rows from the previous index are kept)
+
+    Returns:
+        Dictionary with build statistics
+    """
+    client = storage.Client()
+    bucket = client.bucket(bucket_name)
+
+    # (blob_name, generation) pairs already indexed
+    existing = open_existing_index(bucket_name, index_path) if incremental else None
+    indexed_generations: dict[str, int] = {}
+    if existing is not None:
+        for batch in existing.iter_batches(columns=["blob_name", "generation"]):
+            indexed_generations.update(
+                zip(batch.column("blob_name").to_pylist(), batch.column("generation").to_pylist())
+            )
+        print(f"Existing index covers {len(indexed_generations)} file(s)", file=sys.stderr)
+
+    unchanged: set[str] = set()
+
+    def blobs_to_index() -> Iterator[storage.Blob]:
+        for blob in bucket.list_blobs(prefix=prefix):
+            if not blob.name.endswith(".json"):
+                continue
+            if indexed_generations.get(blob.name) == blob.generation:
+                unchanged.add(blob.name)
+                continue
+            yield blob
+
+    files_indexed = 0
+    errors = []
+    # Files that failed to index: their rows from the previous index (if any) are kept.
+    # Their old generation is kept too, so a later --incremental run retries them
+    failed: set[str] = set()
+
+    with tempfile.TemporaryDirectory(prefix="reply-index-") as spool_dir:
+        spool = PartitionSpool(spool_dir)
+
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            for blob, future in iter_index_rows(executor, blobs_to_index(), 2 * concurrency):
+                try:
+                    spool.add_rows(future.result())
+                except Exception as e:
+                    error_msg = f"Error indexing {blob.name}: {str(e)}"
+                    errors.append(error_msg)
+                    failed.add(blob.name)
+                    print(f"  ✗ {error_msg}", file=sys.stderr)
+                    continue
+                files_indexed += 1
+                if files_indexed % 1000 == 0:
+                    print(f"  Indexed {files_indexed} files...", file=sys.stderr)
+
+        if failed and force and existing is None:
+            # Full rebuild: the previous index is only read for the rows of the failed files
+            existing = open_existing_index(bucket_name, index_path)
+        if existing is not None and (unchanged or failed):
+            # Files that were deleted or rewritten drop out with their old rows
+            kept_names = pa.array(list(unchanged | failed))
+            for batch in existing.iter_batches():
+                kept = batch.filter(pc.is_in(batch.column("blob_name"), kept_names))
+                spool.add_rows(kept.to_pylist())
+
+        uri = None
+        if dry_run or (errors and not force):
+            total_rows = sum(table.num_rows for table in spool.partitions())
+        else:
+            total_rows = write_index(spool.partitions(), bucket_name, index_path)
+            uri = f"gs://{bucket_name}/{index_path}"
+
+    return {
+        "index_uri": uri,
+        "files_indexed": files_indexed,
+        "files_unchanged": len(unchanged),
+        "total_rows": total_rows,
+        "errors": errors,
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(
+        description="Build the reverse reply index (in_reply_to_post_id -> files) in GCS",
+    )
+    parser.add_argument(
+        "--bucket",
+        type=str,
+        default=None,
+        help="GCS bucket name (default: from GCS_BUCKET_NAME env var)",
+    )
+    parser.add_argument(
+        "--prefix",
+        type=str,
+        default="raw/",
+        help="Prefix of the JSON files to index (default: raw/)",
+    )
+    parser.add_argument(
+        "--index-path",
+        type=str,
+        default=DEFAULT_INDEX_PATH,
+        help=f"Object path of the index in the bucket (default: {DEFAULT_INDEX_PATH})",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Number of files downloaded in parallel (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help="Only download files added or changed since the previous index",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Build the index but do not upload it",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Upload the index even if some files failed to index",
+    )
+
+    args = parser.parse_args()
+
+    bucket_name = args.bucket or os.getenv("GCS_BUCKET_NAME")
+    if not bucket_name:
+        print(
+            "Error: GCS_BUCKET_NAME not found in environment and --bucket not provided",
+            file=sys.stderr,
+        )
+        return 1
+
+    try:
+        stats = build_reply_index(
+            bucket_name=bucket_name,
+            prefix=args.prefix,
+            index_path=args.index_path,
+            concurrency=args.concurrency,
+            incremental=args.incremental,
+            dry_run=args.dry_run,
+            force=args.force,
+        )
+    except Exception as e:
+        print(f"Error: {str(e)}", file=sys.stderr)
+        return 1
+
+    print(f"Files indexed: {stats['files_indexed']}")
+    print(f"Files unchanged: {stats['files_unchanged']}")
+    print(f"Index rows: {stats['total_rows']}")
+    if stats["errors"]:
+        print(f"Errors: {len(stats['errors'])}")
+    if stats["index_uri"]:
+        print(f"Index written to {stats['index_uri']}")
+    elif args.dry_run:
+        print("Dry run: index not uploaded")
+    else:
+        print("Index not uploaded: some files failed to index (use --force to upload anyway)")
+    return 1 if stats["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
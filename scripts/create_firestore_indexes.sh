@@ -59,6 +59,29 @@ gcloud firestore indexes composite create \
   --field-config field-path=updated_at,order=ASCENDING \
   2>&1 || echo "   (El índice puede ya existir)"
 
+# Índice: status + updated_at DESC (para list_successful_jobs_today: jobs done de hoy, más recientes primero)
+echo "4️⃣  Creando índice: pending_jobs - status + updated_at (descendente)..."
+gcloud firestore indexes composite create \
+  --project="${PROJECT_ID}" \
+  --database="${DATABASE}" \
+  --collection-group=pending_jobs \
+  --query-scope=COLLECTION \
+  --field-config field-path=status,order=ASCENDING \
+  --field-config field-path=updated_at,order=DESCENDING \
+  2>&1 || echo "   (El índice puede ya existir)"
+
+# Índice: status + candidate_id + updated_at (para retry_empty_result_jobs --candidate-id: jobs empty_result de un candidato, más antiguos primero)
+echo "5️⃣  Creando índice: pending_jobs - status + candidate_id + updated_at..."
+gcloud firestore indexes composite create \
+  --project="${PROJECT_ID}" \
+  --database="${DATABASE}" \
+  --collection-group=pending_jobs \
+  --query-scope=COLLECTION \
+  --field-config field-path=status,order=ASCENDING \
+  --field-config field-path=candidate_id,order=ASCENDING \
+  --field-config field-path=updated_at,order=ASCENDING \
+  2>&1 || echo "   (El índice puede ya existir)"
+
 echo ""
 echo "=========================================="
 echo "Índices creados/verificados"
@@ -155,6 +155,21 @@ INSTAGRAM_SCHEMA = pa.schema(
 )
 
 
+def split_blob_path(blob_name: str) -> list[str]:
+    """
+    Split a blob name into path parts without the raw/ prefix and .json extension.
+
+    Uses a bounded split: only the first four parts (country, platform, candidate_id,
+    post_id) are ever read, so deeper paths do not allocate a full list.
+    """
+    if blob_name.endswith(".json"):
+        blob_name = blob_name[:-5]
+    # Handle both raw/ prefix and direct paths
+    if blob_name.startswith("raw/"):
+        blob_name = blob_name[4:]
+    return blob_name.split("/", 4)
+
+
 def parse_gcs_path(blob_name: str) -> dict[str, str]:
     """
     Parse GCS blob path to extract metadata.
@@ -164,11 +179,7 @@ def parse_gcs_path(blob_name: str) -> dict[str, str]:
     Only processes files with candidate_id as a subdirectory.
     Files directly in raw/{country}/{platform}/ are ignored.
     """
-    parts = blob_name.replace(".json", "").split("/")
-
-    # Handle both raw/ prefix and direct paths
-    if parts[0] == "raw":
-        parts = parts[1:]
+    parts = split_blob_path(blob_name)
 
     if len(parts) >= 4:
         # Correct format: country, platform, candidate_id, post_id
@@ -418,7 +429,8 @@ def read_json_from_gcs(
     bucket = client.bucket(bucket_name)
 
     results = []
-    blobs = bucket.list_blobs(prefix=prefix)
+    # Only request the fields we use; full blob metadata makes large listings slow
+    blobs = bucket.list_blobs(prefix=prefix, fields="items(name,updated),nextPageToken")
 
     for blob in blobs:
         if not blob.name.lower().endswith(".json"):
@@ -426,10 +438,7 @@ def read_json_from_gcs(
 
         # Only process files in the correct structure: raw/{country}/{platform}/{candidate_id}/{post_id}.json
         # Skip files directly in raw/{country}/{platform}/ (without candidate_id subdirectory)
-        parts = blob.name.split("/")
-
-        # Remove 'raw' prefix if present for counting
-        path_parts = parts[1:] if parts[0] == "raw" else parts
+        path_parts = split_blob_path(blob.name)
 
         # Must have at least 4 parts: country, platform, candidate_id, post_id
         if len(path_parts) < 4:
@@ -438,11 +447,9 @@ def read_json_from_gcs(
             )
             continue
 
-        # Apply candidate filter if specified
-        if candidate_filter:
-            # Check if candidate_id is in the path (should be at index 2 after removing 'raw')
-            if candidate_filter not in parts:
-                continue
+        # Apply candidate filter if specified (candidate_id is at index 2 after removing 'raw')
+        if candidate_filter and path_parts[2] != candidate_filter:
+            continue
 
         try:
             raw = blob.download_as_text(encoding="utf-8")
@@ -11,6 +11,12 @@ Usage:
     # Export to CSV
     poetry run python scripts/list_successful_jobs_today.py --output-csv jobs_today.csv
 
+    # Resumable export (re-run the same command after an interruption)
+    poetry run python scripts/list_successful_jobs_today.py --output-csv jobs_today.csv --resume-file .jobs_today.cursor
+
+    # Stream CSV to stdout (report goes to stderr)
+    poetry run python scripts/list_successful_jobs_today.py --output-csv - | head
+
     # Filter by candidate
     poetry run python scripts/list_successful_jobs_today.py --candidate-id hnd01monc
 
@@ -19,15 +25,23 @@ Usage:
 
     # Filter by country
     poetry run python scripts/list_successful_jobs_today.py --country honduras
+
+    # Only show the 20 most recent jobs (single small query, no summary)
+    poetry run python scripts/list_successful_jobs_today.py --preview-only
 """
 
 import argparse
 import csv
+import json
 import os
+import signal
 import sys
-from datetime import datetime, timezone
+from collections import Counter
+from datetime import date, datetime, time, timedelta, timezone
+from functools import lru_cache, partial
+from operator import itemgetter
 from pathlib import Path
-from typing import Any
+from typing import Any, Iterator
 
 try:
     from dotenv import load_dotenv
@@ -40,6 +54,7 @@ except ImportError:
 sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 try:
+    from google.api_core.datetime_helpers import DatetimeWithNanoseconds
     from google.cloud import firestore
 except ImportError as e:
     print(f"Error importing google-cloud-firestore: {e}", file=sys.stderr)
@@ -48,6 +63,54 @@ except ImportError as e:
 
 load_dotenv()
 
+CSV_FIELDNAMES = (
+    "doc_id",
+    "job_id",
+    "post_id",
+    "platform",
+    "country",
+    "candidate_id",
+    "status",
+    "max_posts_replies",
+    "retry_count",
+    "created_at",
+    "updated_at",
+)
+
+# Job document fields read by this script (projection for Firestore queries)
+JOB_FIELDS = [
+    "job_id",
+    "post_id",
+    "platform",
+    "country",
+    "candidate_id",
+    "status",
+    "max_posts_replies",
+    "retry_count",
+    "created_at",
+    "updated_at",
+]
+
+# Userspace buffer size for the CSV export file (1 MiB)
+CSV_BUFFER_SIZE = 1 << 20
+
+# Extracts the CSV columns of a row, in order, for csv.writer
+get_csv_fields = itemgetter(*CSV_FIELDNAMES)
+
+# Number of jobs fetched per Firestore page
+PAGE_SIZE = 500
+
+# Number of jobs shown in the console preview
+PREVIEW_SIZE = 20
+
+# Number of entries shown per summary bucket (platform, country, candidate)
+SUMMARY_TOP_N = 10
+
+# Preview table row template (header and job rows)
+format_preview_row = (
+    "{job_id:<20} {post_id:<20} {platform:<10} {country:<10} {candidate_id:<12} {updated_at:<20}"
+).format_map
+
 
 def get_firestore_client_custom(
     project_id: str | None = None, database: str = "socialnetworks"
@@ -58,38 +121,106 @@ def get_firestore_client_custom(
     return firestore.Client(database=database)
 
 
+@lru_cache(maxsize=1)
+def _day_range(day: date) -> tuple[datetime, datetime]:
+    """Get the UTC range [start of day, start of next day), cached per day."""
+    start_of_day = datetime.combine(day, time.min, tzinfo=timezone.utc)
+    return start_of_day, start_of_day + timedelta(days=1)
+
+
 def get_today_range() -> tuple[datetime, datetime]:
-    """Get start and end of today in UTC."""
-    now = datetime.now(timezone.utc)
-    start_of_day = datetime(now.year, now.month, now.day, 0, 0, 0, tzinfo=timezone.utc)
-    end_of_day = datetime(now.year, now.month, now.day, 23, 59, 59, 999999, tzinfo=timezone.utc)
-    return start_of_day, end_of_day
+    """Get today's UTC range as a half-open interval [start of today, start of tomorrow)."""
+    return _day_range(datetime.now(timezone.utc).date())
+
+
+def truncate(value: str, width: int = 20) -> str:
+    """Truncate value to width characters, marking the cut with '...'."""
+    return value if len(value) <= width else value[: width - 3] + "..."
+
+
+def format_timestamp(ts: Any) -> str:
+    """Format a Firestore timestamp to readable string."""
+    if ts is None:
+        return "N/A"
+    # Firestore timestamps (DatetimeWithNanoseconds) are datetime subclasses
+    if isinstance(ts, datetime):
+        return ts.strftime("%Y-%m-%d %H:%M:%S UTC")
+    return str(ts)
+
+
+def encode_timestamp(ts: datetime) -> str:
+    """Serialize a Firestore timestamp for the resume file (nanoseconds included)."""
+    if isinstance(ts, DatetimeWithNanoseconds):
+        return ts.rfc3339()
+    return ts.isoformat()
+
+
+def decode_timestamp(value: str) -> datetime:
+    """Parse a timestamp saved by encode_timestamp."""
+    try:
+        return DatetimeWithNanoseconds.from_rfc3339(value)
+    except ValueError:
+        return datetime.fromisoformat(value)
 
 
-def list_successful_jobs_today(
+def load_resume_state(path: str) -> dict[str, Any] | None:
+    """Return the checkpoint saved by an interrupted export, or None if there is none."""
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        content = f.read().strip()
+    return json.loads(content) if content else None
+
+
+def save_resume_state(path: str, state: dict[str, Any]) -> None:
+    """Save an export checkpoint (written to a temporary file and renamed, so never partial)."""
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(state, f)
+    os.replace(tmp_path, path)
+
+
+def iter_successful_jobs_today(
     collection: str = "pending_jobs",
     database: str = "socialnetworks",
     project_id: str | None = None,
     candidate_id: str | None = None,
     platform: str | None = None,
     country: str | None = None,
-) -> list[dict[str, Any]]:
+    limit: int | None = None,
+    day: date | None = None,
+    start_after: tuple[datetime, str] | None = None,
+    page_size: int = PAGE_SIZE,
+) -> Iterator[dict[str, Any]]:
     """
-    List all successful jobs (status='done') that were updated today.
-
-    Returns:
-        List of job documents with their details
+    Iterate over successful jobs (status='done') that were updated today.
+
+    Rows are yielded as they arrive from Firestore, already formatted for
+    display/CSV export, so callers never hold the full result set in memory.
+    Jobs are fetched in pages (one short RPC each) chained with query cursors.
+
+    Args:
+        limit: Maximum number of jobs to fetch (most recent first). None fetches all.
+        day: UTC day whose jobs are listed (default: today)
+        start_after: Resume after this (updated_at, doc_id) position, as saved in a
+            resume file. Built from the exported values rather than by reading the job
+            again, so the cursor holds even if the job changed or was deleted since.
+        page_size: Number of jobs fetched per page
+
+    Yields:
+        Job rows (dict with CSV_FIELDNAMES keys, plus the raw '_updated_at' timestamp)
     """
     client = get_firestore_client_custom(project_id, database)
 
-    # Get today's date range
-    start_of_day, end_of_day = get_today_range()
+    # Get the day's date range
+    start_of_day, start_of_tomorrow = _day_range(day) if day else get_today_range()
 
-    # Build query - only filter by status to avoid index requirement
-    # We'll filter by date and other fields in Python
+    # Build query - equality filters first, then the day window as a range on updated_at.
+    # Requires composite index pending_jobs (status ASC, updated_at DESC), see
+    # scripts/create_firestore_indexes.sh. Optional equality filters may need their own
+    # composite index; Firestore returns a link to create it when missing.
     query = client.collection(collection).where("status", "==", "done")
 
-    # Apply optional filters that don't require composite index
     if candidate_id:
         query = query.where("candidate_id", "==", candidate_id)
     if platform:
@@ -97,52 +228,52 @@ def list_successful_jobs_today(
     if country:
         query = query.where("country", "==", country.lower())
 
-    # Fetch all jobs with status='done' (and optional filters)
-    # Then filter by date in Python to avoid index requirement
-    jobs = []
-    for doc in query.stream():
-        job_data = doc.to_dict()
-        job_data["_doc_id"] = doc.id
-
-        # Filter by updated_at date in Python
-        updated_at = job_data.get("updated_at")
-        if updated_at is None:
-            continue
-
-        # Convert Firestore timestamp to datetime if needed
-        if hasattr(updated_at, "timestamp"):
-            updated_dt = updated_at
-        elif isinstance(updated_at, datetime):
-            updated_dt = updated_at
-        else:
-            continue
-
-        # Check if updated today
-        if start_of_day <= updated_dt <= end_of_day:
-            jobs.append(job_data)
-
-    # Sort by updated_at descending (most recent first)
-    jobs.sort(
-        key=lambda x: x.get("updated_at", datetime.min.replace(tzinfo=timezone.utc)),
-        reverse=True,
+    query = (
+        query.where("updated_at", ">=", start_of_day)
+        .where("updated_at", "<", start_of_tomorrow)
+        .order_by("updated_at", direction=firestore.Query.DESCENDING)
+        # Explicit tie-breaker (Firestore's implicit one), so a cursor can name it
+        .order_by("__name__", direction=firestore.Query.DESCENDING)
+        # Only the fields we need are fetched (jobs may carry large payloads)
+        .select(JOB_FIELDS)
     )
 
-    return jobs
-
-
-def format_timestamp(ts: Any) -> str:
-    """Format a Firestore timestamp to readable string."""
-    if ts is None:
-        return "N/A"
-    if hasattr(ts, "timestamp"):
-        # Firestore timestamp
-        dt = ts
-    elif isinstance(ts, datetime):
-        dt = ts
-    else:
-        return str(ts)
+    cursor = None
+    if start_after:
+        updated_at, doc_id = start_after
+        cursor = {"updated_at": updated_at, "__name__": doc_id}
+
+    # Results come back already filtered to today and sorted by updated_at descending
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page_limit = page_size if remaining is None else min(page_size, remaining)
+        page_query = query.limit(page_limit)
+        if cursor is not None:
+            page_query = page_query.start_after(cursor)
+
+        snapshots = list(page_query.stream())
+        for doc in snapshots:
+            job = doc.to_dict()
+            yield {
+                "doc_id": doc.id,
+                "job_id": job.get("job_id", ""),
+                "post_id": job.get("post_id", ""),
+                "platform": job.get("platform", ""),
+                "country": job.get("country", ""),
+                "candidate_id": job.get("candidate_id", ""),
+                "status": job.get("status", ""),
+                "max_posts_replies": job.get("max_posts_replies", ""),
+                "retry_count": job.get("retry_count", 0),
+                "created_at": format_timestamp(job.get("created_at")),
+                "updated_at": format_timestamp(job.get("updated_at")),
+                "_updated_at": job.get("updated_at"),
+            }
 
-    return dt.strftime("%Y-%m-%d %H:%M:%S UTC")
+        if len(snapshots) < page_limit:
+            break
+        cursor = snapshots[-1]
+        if remaining is not None:
+            remaining -= len(snapshots)
 
 
 def main():
@@ -187,126 +318,243 @@ def main():
         "--output-csv",
         type=str,
         default=None,
-        help="Output CSV file path (optional)",
+        help="Output CSV file path (optional, '-' writes CSV to stdout)",
+    )
+    parser.add_argument(
+        "--resume-file",
+        type=str,
+        default=None,
+        help="File where the export progress is saved after each page and on SIGTERM/SIGINT; "
+        "if it exists, the export resumes after the last saved job and appends to --output-csv",
+    )
+    parser.add_argument(
+        "--preview-only",
+        action="store_true",
+        help=f"Only fetch and show the {PREVIEW_SIZE} most recent jobs, without summary "
+        "(ignored with --output-csv)",
     )
 
     args = parser.parse_args()
 
+    # With --output-csv -, CSV rows go to stdout and the report goes to stderr
+    csv_to_stdout = args.output_csv == "-"
+    report = partial(print, file=sys.stderr if csv_to_stdout else sys.stdout)
+
     # Get project_id from environment if not provided
     project_id = args.project_id or os.getenv("GCP_PROJECT_ID")
 
-    print("=== Successful Jobs Today ===")
-    print(f"Project ID: {project_id or 'from environment'}")
-    print(f"Database: {args.database}")
-    print(f"Collection: {args.collection}")
-    start_of_day, end_of_day = get_today_range()
-    print(f"Date range: {start_of_day.strftime('%Y-%m-%d')} (UTC)")
+    # Resume after the last job saved by a previous (interrupted) run, over the same day
+    # even if it has ended since
+    resume_state = load_resume_state(args.resume_file) if args.resume_file else None
+    day = date.fromisoformat(resume_state["day"]) if resume_state else None
+    start_after = None
+    if resume_state:
+        start_after = (decode_timestamp(resume_state["updated_at"]), resume_state["doc_id"])
+
+    report("=== Successful Jobs Today ===")
+    report(f"Project ID: {project_id or 'from environment'}")
+    report(f"Database: {args.database}")
+    report(f"Collection: {args.collection}")
+    start_of_day, _ = _day_range(day) if day else get_today_range()
+    day = start_of_day.date()
+    report(f"Date range: {start_of_day.strftime('%Y-%m-%d')} (UTC)")
     if args.candidate_id:
-        print(f"Filter: candidate_id={args.candidate_id}")
+        report(f"Filter: candidate_id={args.candidate_id}")
     if args.platform:
-        print(f"Filter: platform={args.platform}")
+        report(f"Filter: platform={args.platform}")
     if args.country:
-        print(f"Filter: country={args.country}")
-    print()
+        report(f"Filter: country={args.country}")
+    report()
 
-    try:
-        jobs = list_successful_jobs_today(
-            collection=args.collection,
-            database=args.database,
-            project_id=project_id,
-            candidate_id=args.candidate_id,
-            platform=args.platform,
-            country=args.country,
+    # Preview-only: the server returns just the most recent jobs, no summary is computed
+    preview_only = args.preview_only and not args.output_csv
+
+    resume_doc_id = resume_state["doc_id"] if resume_state else None
+    if resume_doc_id:
+        report(
+            f"Resuming after job document {resume_doc_id} "
+            f"({resume_state['total']} jobs already exported)\n"
         )
 
-        print(f"Found {len(jobs)} successful jobs today\n")
+    # SIGTERM/SIGINT interrupt the export at once, even while the stream is blocked
+    # waiting for a page; a signal arriving mid-row is deferred to the row's end so
+    # the saved progress always matches the rows written
+    stop_signal = None
+    in_row = False
 
-        if len(jobs) == 0:
-            print("No successful jobs found for today.")
-            return
+    def request_stop(signum, _frame):
+        nonlocal stop_signal
+        stop_signal = signum
+        if not in_row:
+            raise KeyboardInterrupt
 
-        # Prepare data for display/CSV
-        jobs_data = []
-        for job in jobs:
-            job_info = {
-                "doc_id": job.get("_doc_id", ""),
-                "job_id": job.get("job_id", ""),
-                "post_id": job.get("post_id", ""),
-                "platform": job.get("platform", ""),
-                "country": job.get("country", ""),
-                "candidate_id": job.get("candidate_id", ""),
-                "status": job.get("status", ""),
-                "max_posts_replies": job.get("max_posts_replies", ""),
-                "retry_count": job.get("retry_count", 0),
-                "created_at": format_timestamp(job.get("created_at")),
-                "updated_at": format_timestamp(job.get("updated_at")),
-            }
-            jobs_data.append(job_info)
-
-        # Display summary
-        print("Summary:")
-        print("=" * 80)
-        platforms = {}
-        countries = {}
-        candidates = {}
-        for job in jobs_data:
-            platform = job["platform"]
-            country = job["country"]
-            candidate = job["candidate_id"]
-            platforms[platform] = platforms.get(platform, 0) + 1
-            countries[country] = countries.get(country, 0) + 1
-            candidates[candidate] = candidates.get(candidate, 0) + 1
-
-        print(f"Total jobs: {len(jobs_data)}")
-        print("\nBy platform:")
-        for platform, count in sorted(platforms.items()):
-            print(f"  {platform}: {count}")
-        print("\nBy country:")
-        for country, count in sorted(countries.items()):
-            print(f"  {country}: {count}")
-        print("\nBy candidate:")
-        for candidate, count in sorted(candidates.items()):
-            print(f"  {candidate}: {count}")
-
-        # Display first 20 jobs
-        print("\n" + "=" * 80)
-        print("Jobs (showing first 20):")
-        print("=" * 80)
-        print(
-            f"{'Job ID':<20} {'Post ID':<20} {'Platform':<10} {'Country':<10} "
-            f"{'Candidate':<12} {'Updated At':<20}"
-        )
-        print("-" * 80)
+    if args.resume_file:
+        signal.signal(signal.SIGTERM, request_stop)
+        signal.signal(signal.SIGINT, request_stop)
 
-        for job in jobs_data[:20]:
-            job_id_short = job["job_id"][:17] + "..." if len(job["job_id"]) > 20 else job["job_id"]
-            post_id_short = (
-                job["post_id"][:17] + "..." if len(job["post_id"]) > 20 else job["post_id"]
+    csv_file = None
+    try:
+        # Single pass over the stream: CSV rows are written as they arrive, while
+        # summary counters and the preview are accumulated alongside
+        writer = None
+        if csv_to_stdout:
+            writer = csv.writer(sys.stdout)
+            writer.writerow(CSV_FIELDNAMES)
+        elif args.output_csv:
+            csv_path = Path(args.output_csv)
+            # Large buffer: rows are flushed to disk in big writes instead of every 8 KiB
+            mode = "a" if resume_doc_id else "w"
+            csv_file = open(csv_path, mode, newline="", encoding="utf-8", buffering=CSV_BUFFER_SIZE)
+            if resume_doc_id and resume_state.get("csv_offset") is not None:
+                # Rows written after the checkpoint (possibly ending in a cut line) are
+                # fetched again, so drop them before appending
+                csv_file.truncate(resume_state["csv_offset"])
+            writer = csv.writer(csv_file)
+            if not resume_doc_id:
+                writer.writerow(CSV_FIELDNAMES)
+
+        # Counts of the previous runs are carried in the resume file, so the summary
+        # covers the whole export
+        previous = resume_state or {}
+        platforms: Counter[str] = Counter(previous.get("platforms", {}))
+        countries: Counter[str] = Counter(previous.get("countries", {}))
+        candidates: Counter[str] = Counter(previous.get("candidates", {}))
+        preview: list[dict[str, Any]] = []
+        total = previous.get("total", 0)
+
+        def save_checkpoint(row: dict[str, Any]) -> None:
+            # Rows up to the saved cursor must be on disk before the cursor is saved
+            csv_offset = None
+            if csv_file is not None:
+                csv_file.flush()
+                csv_offset = csv_file.tell()
+            save_resume_state(
+                args.resume_file,
+                {
+                    "day": day.isoformat(),
+                    "updated_at": encode_timestamp(row["_updated_at"]),
+                    "doc_id": row["doc_id"],
+                    "csv_offset": csv_offset,
+                    "total": total,
+                    "platforms": platforms,
+                    "countries": countries,
+                    "candidates": candidates,
+                },
             )
-            print(
-                f"{job_id_short:<20} {post_id_short:<20} {job['platform']:<10} "
-                f"{job['country']:<10} {job['candidate_id']:<12} {job['updated_at']:<20}"
+
+        last_row = None
+        try:
+            for row in iter_successful_jobs_today(
+                collection=args.collection,
+                database=args.database,
+                project_id=project_id,
+                candidate_id=args.candidate_id,
+                platform=args.platform,
+                country=args.country,
+                limit=PREVIEW_SIZE if preview_only else None,
+                day=day,
+                start_after=start_after,
+            ):
+                in_row = True
+                total += 1
+                if writer is not None:
+                    writer.writerow(get_csv_fields(row))
+                platforms[row["platform"]] += 1
+                countries[row["country"]] += 1
+                candidates[row["candidate_id"]] += 1
+                if len(preview) < PREVIEW_SIZE:
+                    preview.append(row)
+                last_row = row
+                if args.resume_file and total % PAGE_SIZE == 0:
+                    save_checkpoint(row)
+                in_row = False
+                if stop_signal is not None:
+                    raise KeyboardInterrupt
+        except KeyboardInterrupt:
+            if not args.resume_file:
+                raise
+            # Without a row from this run, the previous checkpoint (if any) still holds
+            if last_row is not None:
+                save_checkpoint(last_row)
+            report(f"\nInterrupted after {total} jobs, progress saved to {args.resume_file}")
+            sys.exit(128 + (stop_signal or signal.SIGINT))
+
+        # Export finished: a later run starts from scratch
+        if args.resume_file and os.path.exists(args.resume_file):
+            os.remove(args.resume_file)
+
+        if total == 0:
+            report("No successful jobs found for today.")
+            return
+
+        if not preview_only:
+            report(f"Found {total} successful jobs today\n")
+
+            # Display summary
+            report("Summary:")
+            report("=" * 80)
+            report(f"Total jobs: {total}")
+            report(f"\nBy platform (top {SUMMARY_TOP_N}):")
+            for platform, count in platforms.most_common(SUMMARY_TOP_N):
+                report(f"  {platform}: {count}")
+            report(f"\nBy country (top {SUMMARY_TOP_N}):")
+            for country, count in countries.most_common(SUMMARY_TOP_N):
+                report(f"  {country}: {count}")
+            report(f"\nBy candidate (top {SUMMARY_TOP_N}):")
+            for candidate, count in candidates.most_common(SUMMARY_TOP_N):
+                report(f"  {candidate}: {count}")
+
+        # Display first jobs
+        report("\n" + "=" * 80)
+        if resume_doc_id:
+            report(f"Jobs (showing first {PREVIEW_SIZE} exported by this run):")
+        else:
+            report(f"Jobs (showing first {PREVIEW_SIZE}):")
+        report("=" * 80)
+        report(
+            format_preview_row(
+                {
+                    "job_id": "Job ID",
+                    "post_id": "Post ID",
+                    "platform": "Platform",
+                    "country": "Country",
+                    "candidate_id": "Candidate",
+                    "updated_at": "Updated At",
+                }
+            )
+        )
+        report("-" * 80)
+
+        for job in preview:
+            report(
+                format_preview_row(
+                    {
+                        **job,
+                        "job_id": truncate(job["job_id"]),
+                        "post_id": truncate(job["post_id"]),
+                    }
+                )
             )
 
-        if len(jobs_data) > 20:
-            print(f"\n... and {len(jobs_data) - 20} more jobs")
+        if total > len(preview):
+            report(f"\n... and {total - len(preview)} more jobs")
 
-        # Export to CSV if requested
         if args.output_csv:
-            csv_path = Path(args.output_csv)
-            with open(csv_path, "w", newline="", encoding="utf-8") as f:
-                if jobs_data:
-                    writer = csv.DictWriter(f, fieldnames=jobs_data[0].keys())
-                    writer.writeheader()
-                    writer.writerows(jobs_data)
-            print(f"\nExported {len(jobs_data)} jobs to {csv_path}")
+            report(f"\nExported {total} jobs to {'stdout' if csv_to_stdout else args.output_csv}")
 
+    except BrokenPipeError:
+        # Reader of the CSV stream went away (e.g. piped into head): stop the query quietly.
+        # Point stdout at devnull so the interpreter's final flush doesn't fail again.
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
     except Exception as e:
         print(f"\nERROR: {e}", file=sys.stderr)
         import traceback
 
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if csv_file is not None:
+            csv_file.close()
 
 
 if __name__ == "__main__":
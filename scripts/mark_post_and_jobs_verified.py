@@ -12,13 +12,18 @@ The script reads configuration from .env file or environment variables:
     FIRESTORE_COLLECTION: Firestore posts collection name (default: posts)
 """
 
+import json
 import os
 import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime, timezone
-from typing import Any
+from functools import lru_cache
+from itertools import islice
+from typing import Any, Iterator
 
 try:
     from dotenv import load_dotenv
+    from google.api_core.exceptions import NotFound
     from google.cloud import firestore
 except ImportError as e:
     missing = "dotenv" if "dotenv" in str(e) else "google-cloud-firestore"
@@ -30,14 +35,27 @@ except ImportError as e:
         print("Install it with: poetry add google-cloud-firestore")
     sys.exit(1)
 
+# orjson is optional: faster JSON output when installed, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Maximum number of writes Firestore accepts in a single batch commit
+FIRESTORE_BATCH_SIZE = 500
+
+# Report job update progress every this many jobs
+PROGRESS_EVERY = 1000
+
 
+@lru_cache(maxsize=8)
 def get_firestore_client(
     project_id: str | None = None, database_name: str = "socialnetworks"
 ) -> firestore.Client:
-    """Initialize and return Firestore client."""
+    """Initialize and return Firestore client (cached per project/database)."""
     if project_id:
         return firestore.Client(project=project_id, database=database_name)
     return firestore.Client(database=database_name)
@@ -48,6 +66,7 @@ def query_jobs_by_post_doc_id(
     database_name: str = "socialnetworks",
     project_id: str | None = None,
     post_doc_id: str = "",
+    client: firestore.Client | None = None,
 ) -> list[dict[str, Any]]:
     """
     Query Firestore for jobs associated with a specific post_doc_id.
@@ -57,12 +76,21 @@ def query_jobs_by_post_doc_id(
         database_name: Firestore database name (default: "socialnetworks")
         project_id: GCP project ID (if None, uses default from gcloud)
         post_doc_id: Post document ID to filter jobs
+        client: Firestore client to reuse (if None, uses the cached client for
+            project_id/database_name)
 
     Returns:
-        List of job documents with all fields, including '_doc_id' field with Firestore document ID
+        List of job documents with 'job_id' and 'status' fields, including '_doc_id' field
+        with Firestore document ID
     """
-    client = get_firestore_client(project_id, database_name)
-    query = client.collection(collection).where("post_doc_id", "==", post_doc_id)
+    if client is None:
+        client = get_firestore_client(project_id, database_name)
+    # Only fetch the fields used to report and update jobs
+    query = (
+        client.collection(collection)
+        .where("post_doc_id", "==", post_doc_id)
+        .select(["job_id", "status"])
+    )
 
     jobs = []
     for doc in query.stream():
@@ -73,6 +101,26 @@ def query_jobs_by_post_doc_id(
     return jobs
 
 
+def count_jobs_by_post_doc_id(
+    client: firestore.Client,
+    collection: str,
+    post_doc_id: str,
+) -> int:
+    """
+    Count jobs associated with a post_doc_id using a server-side COUNT aggregation.
+
+    Args:
+        client: Firestore client
+        collection: Jobs collection name
+        post_doc_id: Post document ID to filter jobs
+
+    Returns:
+        Number of jobs (costs a single aggregation read instead of one read per job)
+    """
+    query = client.collection(collection).where("post_doc_id", "==", post_doc_id)
+    return query.count().get()[0][0].value
+
+
 def get_post_document(
     client: firestore.Client,
     posts_collection: str,
@@ -100,44 +148,42 @@ def get_post_document(
         return None
 
 
-def update_job_status_in_firestore(
+def get_post_documents(
     client: firestore.Client,
-    collection: str,
-    doc_id: str,
-    new_status: str,
-) -> None:
+    posts_collection: str,
+    post_doc_ids: list[str],
+) -> dict[str, dict[str, Any]]:
     """
-    Update the status field of a job document in Firestore.
+    Get several post documents from Firestore in a single batched read.
 
     Args:
         client: Firestore client
-        collection: Collection name
-        doc_id: Document ID
-        new_status: New status value
+        posts_collection: Posts collection name
+        post_doc_ids: Post document IDs
+
+    Returns:
+        Dict mapping post document ID to its data (missing posts are omitted)
     """
-    doc_ref = client.collection(collection).document(doc_id)
-    now = datetime.now(timezone.utc)
-    doc_ref.update({"status": new_status, "updated_at": now})
+    collection_ref = client.collection(posts_collection)
+    refs = [collection_ref.document(post_doc_id) for post_doc_id in post_doc_ids]
+    return {doc.id: doc.to_dict() for doc in client.get_all(refs) if doc.exists}
 
 
-def update_post_status_in_firestore(
-    client: firestore.Client,
-    posts_collection: str,
-    doc_id: str,
-    new_status: str,
-) -> None:
-    """
-    Update the status field of a post document in Firestore.
+def post_not_found_result(post_doc_id: str) -> dict[str, Any]:
+    """Build the result returned when a post document does not exist."""
+    return {
+        "error": f"Post document {post_doc_id} not found",
+        "post_updated": False,
+        "jobs_updated": 0,
+        "jobs": [],
+    }
 
-    Args:
-        client: Firestore client
-        posts_collection: Posts collection name
-        doc_id: Post document ID
-        new_status: New status value
-    """
-    doc_ref = client.collection(posts_collection).document(doc_id)
-    now = datetime.now(timezone.utc)
-    doc_ref.update({"status": new_status, "updated_at": now})
+
+def chunked(items: list[Any], size: int) -> Iterator[list[Any]]:
+    """Yield successive chunks of at most `size` items."""
+    iterator = iter(items)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
 
 
 def mark_post_and_jobs_verified(
@@ -147,6 +193,9 @@ def mark_post_and_jobs_verified(
     database_name: str = "socialnetworks",
     project_id: str | None = None,
     dry_run: bool = False,
+    max_workers: int = 8,
+    post_data: dict[str, Any] | None = None,
+    count_only: bool = False,
 ) -> dict[str, Any]:
     """
     Mark a post and all its associated jobs as verified.
@@ -158,6 +207,10 @@ def mark_post_and_jobs_verified(
         database_name: Firestore database name (default: "socialnetworks")
         project_id: GCP project ID (if None, uses default from gcloud)
         dry_run: If True, don't update Firestore, only report what would be updated
+        max_workers: Maximum number of job batches committed concurrently (default: 8)
+        post_data: Already fetched post document (see get_post_documents). If None,
+            the post is read from Firestore
+        count_only: With dry_run, only count the jobs instead of listing them
 
     Returns:
         Dictionary containing update results and summary statistics
@@ -166,85 +219,161 @@ def mark_post_and_jobs_verified(
     firestore_client = get_firestore_client(project_id, database_name)
 
     # Verify post exists
-    print(f"Checking if post {post_doc_id} exists...", file=sys.stderr)
-    post_data = get_post_document(firestore_client, posts_collection, post_doc_id)
+    if post_data is None:
+        print(f"Checking if post {post_doc_id} exists...", file=sys.stderr)
+        post_data = get_post_document(firestore_client, posts_collection, post_doc_id)
     if not post_data:
-        return {
-            "error": f"Post document {post_doc_id} not found",
-            "post_updated": False,
-            "jobs_updated": 0,
-            "jobs": [],
-        }
+        return post_not_found_result(post_doc_id)
 
     post_id = post_data.get("post_id", "unknown")
     post_status = post_data.get("status", "unknown")
     print(f"Post found: post_id={post_id}, current_status={post_status}", file=sys.stderr)
 
+    if dry_run and count_only:
+        jobs_found = count_jobs_by_post_doc_id(firestore_client, jobs_collection, post_doc_id)
+        print(
+            f"[DRY RUN] Would update {jobs_found} jobs to 'verified' and post {post_doc_id} "
+            f"(post_id={post_id}) from '{post_status}' to 'done'",
+            file=sys.stderr,
+        )
+        return {
+            "post_doc_id": post_doc_id,
+            "post_id": post_id,
+            "post_old_status": post_status,
+            "post_updated": False,
+            "jobs_found": jobs_found,
+            "jobs_updated": jobs_found,
+            "jobs": [],
+            "errors": [],
+            "dry_run": dry_run,
+            "generated_at": datetime.now(timezone.utc).isoformat(),
+        }
+
     # Query all jobs associated with this post
     print(
         f"Querying Firestore for jobs with post_doc_id='{post_doc_id}' in collection '{jobs_collection}'...",
         file=sys.stderr,
     )
-    jobs = query_jobs_by_post_doc_id(jobs_collection, database_name, project_id, post_doc_id)
+    jobs = query_jobs_by_post_doc_id(
+        jobs_collection, database_name, project_id, post_doc_id, client=firestore_client
+    )
     print(f"Found {len(jobs)} jobs associated with post {post_doc_id}", file=sys.stderr)
 
-    # Analyze and update each job
+    # Analyze each job
+    job_infos = []
+    for job in jobs:
+        job_infos.append(
+            {
+                "doc_id": job.get("_doc_id"),
+                "job_id": job.get("job_id", "unknown"),
+                "current_status": job.get("status", "unknown"),
+                "updated": False,
+                "error": None,
+            }
+        )
+
     updated_jobs = []
     errors = []
+    post_updated = False
 
-    for job in jobs:
-        doc_id = job.get("_doc_id")
-        job_id = job.get("job_id", "unknown")
-        current_status = job.get("status", "unknown")
-
-        job_info = {
-            "doc_id": doc_id,
-            "job_id": job_id,
-            "current_status": current_status,
-            "updated": False,
-            "error": None,
-        }
+    total_jobs = len(job_infos)
 
-        if not dry_run:
-            try:
-                update_job_status_in_firestore(
-                    firestore_client, jobs_collection, doc_id, "verified"
-                )
-                job_info["updated"] = True
-                updated_jobs.append(job_info)
+    # Per-job details are kept in the returned 'jobs' list; stderr only gets periodic progress
+    if dry_run:
+        for i, job_info in enumerate(job_infos, 1):
+            updated_jobs.append(job_info)
+            if i % PROGRESS_EVERY == 0 or i == total_jobs:
                 print(
-                    f"Updated job {doc_id} (job_id={job_id}) from '{current_status}' to 'verified'",
+                    f"[DRY RUN] Would update {i}/{total_jobs} jobs to 'verified'",
                     file=sys.stderr,
                 )
-            except Exception as e:
-                job_info["error"] = str(e)
-                errors.append(f"Error updating job {doc_id}: {e}")
-                print(f"Error updating job {doc_id}: {e}", file=sys.stderr)
-        else:
-            updated_jobs.append(job_info)
-            print(
-                f"[DRY RUN] Would update job {doc_id} (job_id={job_id}) from '{current_status}' to 'verified'",
-                file=sys.stderr,
-            )
-
-    # Update post status to 'done'
-    post_updated = False
-    if not dry_run:
-        try:
-            update_post_status_in_firestore(firestore_client, posts_collection, post_doc_id, "done")
-            post_updated = True
-            print(
-                f"Updated post {post_doc_id} (post_id={post_id}) from '{post_status}' to 'done'",
-                file=sys.stderr,
-            )
-        except Exception as e:
-            errors.append(f"Error updating post {post_doc_id}: {e}")
-            print(f"Error updating post {post_doc_id}: {e}", file=sys.stderr)
-    else:
         print(
             f"[DRY RUN] Would update post {post_doc_id} (post_id={post_id}) from '{post_status}' to 'done'",
             file=sys.stderr,
         )
+    else:
+        # Batch job updates (one commit per FIRESTORE_BATCH_SIZE writes). Batches touch
+        # disjoint documents, so they are committed concurrently; the post is only flipped
+        # to 'done' once every job batch has been committed. Jobs deleted since the query
+        # are reported but do not block the post.
+        now = datetime.now(timezone.utc)
+        jobs_ref = firestore_client.collection(jobs_collection)
+        post_ref = firestore_client.collection(posts_collection).document(post_doc_id)
+
+        def commit_job_updates(refs: list[firestore.DocumentReference]) -> None:
+            batch = firestore_client.batch()
+            for ref in refs:
+                batch.update(ref, {"status": "verified", "updated_at": now})
+            batch.commit()
+
+        def commit_job_batch(chunk: list[dict[str, Any]]) -> list[dict[str, Any]]:
+            """Commit the updates of a chunk of jobs and return the jobs that no longer exist."""
+            refs = [jobs_ref.document(job_info["doc_id"]) for job_info in chunk]
+            try:
+                commit_job_updates(refs)
+                return []
+            except NotFound:
+                pass
+
+            # update() requires the document to exist, so a single deleted job fails the
+            # whole batch: commit it again without the missing ones
+            existing = {
+                doc.id for doc in firestore_client.get_all(refs, field_paths=[]) if doc.exists
+            }
+            if existing:
+                commit_job_updates([ref for ref in refs if ref.id in existing])
+            return [job_info for job_info in chunk if job_info["doc_id"] not in existing]
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = {
+                executor.submit(commit_job_batch, chunk): chunk
+                for chunk in chunked(job_infos, FIRESTORE_BATCH_SIZE)
+            }
+            batches_failed = False
+            for future in as_completed(futures):
+                chunk = futures[future]
+                try:
+                    missing = future.result()
+                except Exception as e:
+                    batches_failed = True
+                    for job_info in chunk:
+                        job_info["error"] = str(e)
+                        errors.append(f"Error updating job {job_info['doc_id']}: {e}")
+                    print(f"Error committing batch of {len(chunk)} jobs: {e}", file=sys.stderr)
+                    continue
+
+                for job_info in missing:
+                    job_info["error"] = f"Job document {job_info['doc_id']} not found"
+                    errors.append(f"Error updating job {job_info['doc_id']}: document not found")
+                    print(f"Job document {job_info['doc_id']} not found, skipped", file=sys.stderr)
+
+                previous_count = len(updated_jobs)
+                for job_info in chunk:
+                    if job_info["error"] is None:
+                        job_info["updated"] = True
+                        updated_jobs.append(job_info)
+                if len(updated_jobs) // PROGRESS_EVERY > previous_count // PROGRESS_EVERY:
+                    print(f"Updated {len(updated_jobs)}/{total_jobs} jobs", file=sys.stderr)
+
+        print(f"Updated {len(updated_jobs)}/{total_jobs} jobs to 'verified'", file=sys.stderr)
+
+        if batches_failed:
+            errors.append(f"Post {post_doc_id} not updated: some job batches failed")
+            print(
+                f"Skipping update of post {post_doc_id}: some job batches failed",
+                file=sys.stderr,
+            )
+        else:
+            try:
+                post_ref.update({"status": "done", "updated_at": now})
+                post_updated = True
+                print(
+                    f"Updated post {post_doc_id} (post_id={post_id}) from '{post_status}' to 'done'",
+                    file=sys.stderr,
+                )
+            except Exception as e:
+                errors.append(f"Error updating post {post_doc_id}: {e}")
+                print(f"Error updating post {post_doc_id}: {e}", file=sys.stderr)
 
     return {
         "post_doc_id": post_doc_id,
@@ -260,18 +389,79 @@ def mark_post_and_jobs_verified(
     }
 
 
+def dumps_json(obj: Any) -> str:
+    """Serialize obj as indented JSON (non-ASCII kept as-is, unknown types via str)."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2, default=str).decode()
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=str)
+
+
+def format_text_report(result: dict[str, Any]) -> str:
+    """Format a mark_post_and_jobs_verified result as a text report."""
+    if result.get("error"):
+        return f"ERROR: {result['error']}"
+
+    output_lines = []
+    output_lines.append("=" * 80)
+    output_lines.append("MARK POST AND JOBS AS VERIFIED REPORT")
+    output_lines.append("=" * 80)
+    output_lines.append("")
+    output_lines.append(f"Generated at: {result['generated_at']}")
+    output_lines.append(f"Dry run: {result['dry_run']}")
+    output_lines.append("")
+    output_lines.append("POST INFORMATION:")
+    output_lines.append(f"  Post Document ID: {result['post_doc_id']}")
+    output_lines.append(f"  Post ID: {result['post_id']}")
+    output_lines.append(f"  Old Status: {result['post_old_status']}")
+    status = (
+        "WOULD BE UPDATED"
+        if result["dry_run"]
+        else ("UPDATED" if result["post_updated"] else "NOT UPDATED")
+    )
+    output_lines.append(f"  Post Status: {status} to 'done'")
+    output_lines.append("")
+    output_lines.append("JOBS INFORMATION:")
+    output_lines.append(f"  Jobs Found: {result['jobs_found']}")
+    output_lines.append(f"  Jobs Updated: {result['jobs_updated']}")
+    output_lines.append("")
+    if result["jobs"]:
+        output_lines.append("DETAILED JOBS:")
+        for i, job in enumerate(result["jobs"], 1):
+            output_lines.append(f"  Job #{i}:")
+            output_lines.append(f"    Document ID: {job['doc_id']}")
+            output_lines.append(f"    Job ID: {job['job_id']}")
+            output_lines.append(f"    Old Status: {job['current_status']}")
+            job_status = (
+                "WOULD BE UPDATED"
+                if result["dry_run"]
+                else ("UPDATED" if job["updated"] else "NOT UPDATED")
+            )
+            output_lines.append(f"    Status: {job_status} to 'verified'")
+            if job.get("error"):
+                output_lines.append(f"    Error: {job['error']}")
+            output_lines.append("")
+    if result.get("errors"):
+        output_lines.append("ERRORS:")
+        for error in result["errors"]:
+            output_lines.append(f"  - {error}")
+        output_lines.append("")
+    output_lines.append("=" * 80)
+    return "\n".join(output_lines)
+
+
 def main() -> int:
     """Main entry point for the script."""
     import argparse
-    import json
 
     parser = argparse.ArgumentParser(
         description="Mark a post and all its associated jobs as verified"
     )
     parser.add_argument(
-        "post_doc_id",
+        "post_doc_ids",
         type=str,
-        help="Post document ID in Firestore",
+        nargs="+",
+        metavar="post_doc_id",
+        help="Post document ID(s) in Firestore",
     )
     parser.add_argument(
         "--jobs-collection",
@@ -302,6 +492,17 @@ def main() -> int:
         action="store_true",
         help="Don't update Firestore, only report what would be updated",
     )
+    parser.add_argument(
+        "--count-only",
+        action="store_true",
+        help="With --dry-run, only count the jobs (one aggregation read) instead of listing them",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=8,
+        help="Maximum number of job batches committed concurrently (default: 8)",
+    )
     parser.add_argument(
         "--output",
         type=str,
@@ -317,6 +518,8 @@ def main() -> int:
     )
 
     args = parser.parse_args()
+    if args.count_only and not args.dry_run:
+        parser.error("--count-only requires --dry-run")
 
     # Get configuration from environment or arguments
     project_id = args.project_id or os.getenv("GCP_PROJECT_ID")
@@ -328,66 +531,37 @@ def main() -> int:
         print("Running in DRY RUN mode - no changes will be made to Firestore", file=sys.stderr)
 
     try:
-        result = mark_post_and_jobs_verified(
-            post_doc_id=args.post_doc_id,
-            jobs_collection=jobs_collection,
-            posts_collection=posts_collection,
-            database_name=database_name,
-            project_id=project_id,
-            dry_run=args.dry_run,
-        )
+        firestore_client = get_firestore_client(project_id, database_name)
+
+        # Fetch all posts up-front in a single batched read
+        print(f"Checking if {len(args.post_doc_ids)} post(s) exist...", file=sys.stderr)
+        posts = get_post_documents(firestore_client, posts_collection, args.post_doc_ids)
+
+        results = []
+        for post_doc_id in args.post_doc_ids:
+            if post_doc_id not in posts:
+                print(f"Post document {post_doc_id} not found", file=sys.stderr)
+                results.append(post_not_found_result(post_doc_id))
+                continue
+            results.append(
+                mark_post_and_jobs_verified(
+                    post_doc_id=post_doc_id,
+                    jobs_collection=jobs_collection,
+                    posts_collection=posts_collection,
+                    database_name=database_name,
+                    project_id=project_id,
+                    dry_run=args.dry_run,
+                    max_workers=args.max_workers,
+                    post_data=posts[post_doc_id],
+                    count_only=args.count_only,
+                )
+            )
 
-        # Format output
+        # Format output (a single post keeps the single-report shape)
         if args.format == "json":
-            output = json.dumps(result, ensure_ascii=False, indent=2, default=str)
+            output = dumps_json(results[0] if len(results) == 1 else results)
         else:
-            # Text format
-            output_lines = []
-            output_lines.append("=" * 80)
-            output_lines.append("MARK POST AND JOBS AS VERIFIED REPORT")
-            output_lines.append("=" * 80)
-            output_lines.append("")
-            output_lines.append(f"Generated at: {result['generated_at']}")
-            output_lines.append(f"Dry run: {result['dry_run']}")
-            output_lines.append("")
-            output_lines.append("POST INFORMATION:")
-            output_lines.append(f"  Post Document ID: {result['post_doc_id']}")
-            output_lines.append(f"  Post ID: {result['post_id']}")
-            output_lines.append(f"  Old Status: {result['post_old_status']}")
-            status = (
-                "WOULD BE UPDATED"
-                if result["dry_run"]
-                else ("UPDATED" if result["post_updated"] else "NOT UPDATED")
-            )
-            output_lines.append(f"  Post Status: {status} to 'done'")
-            output_lines.append("")
-            output_lines.append("JOBS INFORMATION:")
-            output_lines.append(f"  Jobs Found: {result['jobs_found']}")
-            output_lines.append(f"  Jobs Updated: {result['jobs_updated']}")
-            output_lines.append("")
-            if result["jobs"]:
-                output_lines.append("DETAILED JOBS:")
-                for i, job in enumerate(result["jobs"], 1):
-                    output_lines.append(f"  Job #{i}:")
-                    output_lines.append(f"    Document ID: {job['doc_id']}")
-                    output_lines.append(f"    Job ID: {job['job_id']}")
-                    output_lines.append(f"    Old Status: {job['current_status']}")
-                    job_status = (
-                        "WOULD BE UPDATED"
-                        if result["dry_run"]
-                        else ("UPDATED" if job["updated"] else "NOT UPDATED")
-                    )
-                    output_lines.append(f"    Status: {job_status} to 'verified'")
-                    if job.get("error"):
-                        output_lines.append(f"    Error: {job['error']}")
-                    output_lines.append("")
-            if result.get("errors"):
-                output_lines.append("ERRORS:")
-                for error in result["errors"]:
-                    output_lines.append(f"  - {error}")
-                output_lines.append("")
-            output_lines.append("=" * 80)
-            output = "\n".join(output_lines)
+            output = "\n".join(format_text_report(result) for result in results)
 
         # Write output
         if args.output:
@@ -397,7 +571,7 @@ def main() -> int:
         else:
             print(output)
 
-        return 0 if not result.get("error") else 1
+        return 0 if not any(result.get("error") for result in results) else 1
     except Exception as e:
         print(f"Error marking post and jobs as verified: {e}", file=sys.stderr)
         import traceback
@@ -11,23 +11,105 @@ Create a .env file in the project root with:
 """
 
 import os
+import shutil
 import sys
+import tempfile
+from datetime import datetime
+from functools import lru_cache
+from typing import NamedTuple
 
-try:
-    from dotenv import load_dotenv
-    from google.cloud import firestore
-except ImportError as e:
-    missing = "dotenv" if "dotenv" in str(e) else "google-cloud-firestore"
-    if missing == "dotenv":
-        print("Error: python-dotenv is not installed.")
-        print("Install it with: poetry add python-dotenv")
-    else:
+# Documents fetched per query page
+PAGE_SIZE = 500
+
+# Output lines joined into a single stdout write
+OUTPUT_CHUNK_SIZE = 1000
+
+
+class Record(NamedTuple):
+    """Post details returned by query_with_details."""
+
+    conversation_id_str: str
+    platform: str
+    # Firestore timestamp (a datetime); None when the document has no created_at
+    created_at: datetime | None
+    status: str
+
+
+# Fields returned by query_with_details
+DETAIL_FIELDS = list(Record._fields)
+
+
+@lru_cache(maxsize=8)
+def get_firestore_client(project_id: str = None, database_name: str = "socialnetworks"):
+    """
+    Initialize and return Firestore client (cached per project/database).
+
+    google-cloud-firestore is imported here rather than at module level, so importing
+    this module or running --help does not pay for loading gRPC and credentials.
+    """
+    try:
+        from google.cloud import firestore
+    except ImportError:
         print("Error: google-cloud-firestore is not installed.")
         print("Install it with: poetry add google-cloud-firestore")
-    sys.exit(1)
+        sys.exit(1)
+
+    if project_id:
+        return firestore.Client(project=project_id, database=database_name)
+    return firestore.Client(database=database_name)
+
+
+def stream_in_pages(
+    client,
+    collection: str,
+    query,
+    limit: int = None,
+    cursor_file: str = None,
+    on_checkpoint=None,
+):
+    """
+    Stream query results in pages of PAGE_SIZE documents chained with query cursors.
+
+    If cursor_file is given, the ID of the last document of each page is saved to it once
+    the page has been consumed, and a later call resumes after that document. The file is
+    removed when a short page shows the scan is exhausted; when limit stops the scan it
+    is kept, so the next call continues after the last document returned. on_checkpoint,
+    if given, is called just before the cursor is saved, so a consumer that buffers its
+    output can write it out first and the cursor never gets ahead of what was written.
 
-# Load environment variables from .env file
-load_dotenv()
+    Yields:
+        Document snapshots
+    """
+    cursor = None
+    if cursor_file and os.path.exists(cursor_file):
+        with open(cursor_file, encoding="utf-8") as f:
+            last_doc_id = f.read().strip()
+        if last_doc_id:
+            cursor = client.collection(collection).document(last_doc_id).get()
+
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page_limit = PAGE_SIZE if remaining is None else min(PAGE_SIZE, remaining)
+        page_query = query.limit(page_limit)
+        if cursor is not None:
+            page_query = page_query.start_after(cursor)
+
+        snapshots = list(page_query.stream())
+        yield from snapshots
+
+        if len(snapshots) < page_limit:
+            # Short page: the scan is exhausted, so a later run starts from scratch
+            if cursor_file and os.path.exists(cursor_file):
+                os.remove(cursor_file)
+            break
+        cursor = snapshots[-1]
+        if remaining is not None:
+            remaining -= len(snapshots)
+        if cursor_file:
+            if on_checkpoint is not None:
+                on_checkpoint()
+            with open(cursor_file, "w", encoding="utf-8") as f:
+                f.write(cursor.id)
 
 
 def query_by_status(
@@ -36,6 +118,8 @@ def query_by_status(
     project_id: str = None,
     status: str = "scrapped",
     limit: int = None,
+    cursor_file: str = None,
+    on_checkpoint=None,
 ):
     """
     Query Firestore for records with a specific status.
@@ -46,34 +130,28 @@ def query_by_status(
         project_id: GCP project ID (if None, uses default from gcloud)
         status: Status value to filter by (default: "scrapped")
         limit: Maximum number of results to return (None for all)
+        cursor_file: Checkpoint file to resume an interrupted scan (see stream_in_pages)
+        on_checkpoint: Called before each cursor save (see stream_in_pages)
 
-    Returns:
-        List of conversation_id_str values
+    Yields:
+        conversation_id_str values, as they are streamed from Firestore
     """
-    # Initialize Firestore client
-    if project_id:
-        client = firestore.Client(project=project_id, database=database_name)
-    else:
-        client = firestore.Client(database=database_name)
+    client = get_firestore_client(project_id, database_name)
 
-    # Create query
-    query = client.collection(collection).where("status", "==", status)
+    # Create query (only conversation_id_str is fetched). Post documents use
+    # auto-generated IDs, so a keys-only query cannot return conversation_id_str.
+    query = (
+        client.collection(collection).where("status", "==", status).select(["conversation_id_str"])
+    )
 
-    # Apply limit if specified
-    if limit:
-        docs = query.limit(limit).stream()
-    else:
-        docs = query.stream()
+    docs = stream_in_pages(client, collection, query, limit, cursor_file, on_checkpoint)
 
     # Extract conversation_id_str values
-    conversation_ids = []
     for doc in docs:
         doc_data = doc.to_dict()
         conversation_id = doc_data.get("conversation_id_str", "")
         if conversation_id:
-            conversation_ids.append(conversation_id)
-
-    return conversation_ids
+            yield conversation_id
 
 
 def query_with_details(
@@ -82,6 +160,8 @@ def query_with_details(
     project_id: str = None,
     status: str = "scrapped",
     limit: int = None,
+    cursor_file: str = None,
+    on_checkpoint=None,
 ):
     """
     Query Firestore for records with a specific status and return full details.
@@ -92,38 +172,28 @@ def query_with_details(
         project_id: GCP project ID (if None, uses default from gcloud)
         status: Status value to filter by (default: "scrapped")
         limit: Maximum number of results to return (None for all)
+        cursor_file: Checkpoint file to resume an interrupted scan (see stream_in_pages)
+        on_checkpoint: Called before each cursor save (see stream_in_pages)
 
-    Returns:
-        List of dictionaries with record details
+    Yields:
+        Record tuples with the post details, as they are streamed from Firestore
     """
-    # Initialize Firestore client
-    if project_id:
-        client = firestore.Client(project=project_id, database=database_name)
-    else:
-        client = firestore.Client(database=database_name)
+    client = get_firestore_client(project_id, database_name)
 
-    # Create query
-    query = client.collection(collection).where("status", "==", status)
+    # Create query (only the fields shown in the details are fetched)
+    query = client.collection(collection).where("status", "==", status).select(DETAIL_FIELDS)
 
-    # Apply limit if specified
-    if limit:
-        docs = query.limit(limit).stream()
-    else:
-        docs = query.stream()
+    docs = stream_in_pages(client, collection, query, limit, cursor_file, on_checkpoint)
 
     # Extract full details
-    records = []
     for doc in docs:
-        doc_data = doc.to_dict()
-        record = {
-            "conversation_id_str": doc_data.get("conversation_id_str", ""),
-            "platform": doc_data.get("platform", ""),
-            "created_at": doc_data.get("created_at", ""),
-            "status": doc_data.get("status", ""),
-        }
-        records.append(record)
-
-    return records
+        get = doc.to_dict().get
+        yield Record(
+            get("conversation_id_str", ""),
+            get("platform", ""),
+            get("created_at"),
+            get("status", ""),
+        )
 
 
 if __name__ == "__main__":
@@ -164,9 +234,25 @@ if __name__ == "__main__":
         action="store_true",
         help="Show full record details instead of just conversation_id",
     )
+    parser.add_argument(
+        "--cursor-file",
+        type=str,
+        default=None,
+        help="Checkpoint file saved after each page; if it exists, the scan resumes from it",
+    )
 
     args = parser.parse_args()
 
+    try:
+        from dotenv import load_dotenv
+    except ImportError:
+        print("Error: python-dotenv is not installed.")
+        print("Install it with: poetry add python-dotenv")
+        sys.exit(1)
+
+    # Load environment variables from .env file
+    load_dotenv()
+
     # Get project ID from .env file or command line
     project_id = args.project_id or os.getenv("GCP_PROJECT_ID")
 
@@ -178,32 +264,68 @@ if __name__ == "__main__":
         print(f"Limit: {args.limit}")
     print()
 
+    write = sys.stdout.write
+    out = []
+
+    def flush_output():
+        """Write the buffered lines, so a saved cursor never skips unprinted records."""
+        write("".join(out))
+        out.clear()
+        sys.stdout.flush()
+
     try:
         if args.details:
-            # Get full details
+            # Get full details, printing each record as it arrives
             records = query_with_details(
-                args.collection, args.database, project_id, args.status, args.limit
+                args.collection,
+                args.database,
+                project_id,
+                args.status,
+                args.limit,
+                args.cursor_file,
+                flush_output,
             )
-            print(f"Found {len(records)} records:\n")
-            for i, record in enumerate(records, 1):
-                print(f"{i}. conversation_id: {record['conversation_id_str']}")
-                print(f"   platform: {record['platform']}")
-                print(f"   created_at: {record['created_at']}")
-                print(f"   status: {record['status']}")
-                print()
+            count = 0
+            for count, record in enumerate(records, 1):
+                out.append(
+                    f"{count}. conversation_id: {record.conversation_id_str}\n"
+                    f"   platform: {record.platform}\n"
+                    f"   created_at: {record.created_at or ''}\n"
+                    f"   status: {record.status}\n\n"
+                )
+                if len(out) >= OUTPUT_CHUNK_SIZE:
+                    flush_output()
+            flush_output()
+            print(f"Found {count} records")
         else:
-            # Get only conversation_ids
-            conversation_ids = query_by_status(
-                args.collection, args.database, project_id, args.status, args.limit
-            )
-            print(f"Found {len(conversation_ids)} records with status='{args.status}':\n")
-            for i, conversation_id in enumerate(conversation_ids, 1):
-                print(f"{i}. {conversation_id}")
-
-            # Also print as a list for easy copying
-            if conversation_ids:
-                print("\nConversation IDs (one per line):")
-                print("\n".join(conversation_ids))
+            # Get only conversation_ids, printing them as they arrive. The plain list
+            # printed at the end is spooled to a temporary file, not kept in memory.
+            count = 0
+            with tempfile.TemporaryFile("w+", encoding="utf-8") as id_list:
+                for count, conversation_id in enumerate(
+                    query_by_status(
+                        args.collection,
+                        args.database,
+                        project_id,
+                        args.status,
+                        args.limit,
+                        args.cursor_file,
+                        flush_output,
+                    ),
+                    1,
+                ):
+                    out.append(f"{count}. {conversation_id}\n")
+                    id_list.write(f"{conversation_id}\n")
+                    if len(out) >= OUTPUT_CHUNK_SIZE:
+                        flush_output()
+                flush_output()
+                print(f"\nFound {count} records with status='{args.status}'")
+
+                # Also print as a list for easy copying
+                if count:
+                    print("\nConversation IDs (one per line):")
+                    id_list.seek(0)
+                    shutil.copyfileobj(id_list, sys.stdout)
     except Exception as e:
         print(f"Error querying Firestore: {e}", file=sys.stderr)
         sys.exit(1)
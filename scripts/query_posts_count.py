@@ -6,6 +6,9 @@ Hace múltiples queries por cada status != "done" y suma los resultados.
 """
 
 import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 
 from dotenv import load_dotenv
 from google.cloud import firestore
@@ -17,15 +20,41 @@ PROJECT_ID = os.getenv("GCP_PROJECT_ID", "your-gcp-project-id")
 DATABASE = os.getenv("FIRESTORE_DATABASE", "socialnetworks")
 COLLECTION = os.getenv("FIRESTORE_COLLECTION", "posts")
 
+# Los conteos cambian poco en pocos segundos: se reutilizan durante este intervalo
+COUNT_CACHE_TTL_SECONDS = 60
+
+# Último conteo sin errores: (intervalo de tiempo, {status: cantidad})
+_status_counts_cache: tuple[int, dict[str, int]] | None = None
+
+
+@lru_cache(maxsize=1)
+def get_firestore_client() -> firestore.Client:
+    """Devuelve un cliente de Firestore compartido (un único canal gRPC por proceso)."""
+    return firestore.Client(project=PROJECT_ID, database=DATABASE)
+
+
+def count_posts_by_status(client: firestore.Client, status: str) -> int:
+    """Cuenta posts de Twitter con un status dado (agregación COUNT en el servidor)."""
+    # Query compatible con índice: status + platform + created_at
+    query = (
+        client.collection(COLLECTION)
+        .where("status", "==", status)
+        .where("platform", "==", "twitter")
+    )
+    # count() devuelve un único valor: no se descargan los documentos
+    return query.count().get()[0][0].value
+
 
 def count_twitter_posts_not_done():
     """
     Cuenta posts de Twitter con status distinto a 'done'.
 
     Usa el índice existente: status + platform + created_at
-    Hace queries separadas para cada status != "done" y suma los resultados.
+    Hace queries separadas para cada status != "done" (en paralelo) y suma los resultados.
+    Los conteos se cachean durante COUNT_CACHE_TTL_SECONDS (dashboards/alertas que consultan
+    seguido no repiten las queries); si alguna query falla, el resultado no se cachea.
     """
-    client = firestore.Client(project=PROJECT_ID, database=DATABASE)
+    global _status_counts_cache
 
     # Estados posibles excluyendo "done"
     # Según la documentación: noreplies, done, skipped (y posiblemente failed)
@@ -38,24 +67,35 @@ def count_twitter_posts_not_done():
     print("Usando índice existente: status + platform + created_at")
     print("-" * 60)
 
+    time_bucket = int(time.time() // COUNT_CACHE_TTL_SECONDS)
+    if _status_counts_cache is not None and _status_counts_cache[0] == time_bucket:
+        results = _status_counts_cache[1]
+    else:
+        client = get_firestore_client()
+        # Las queries son independientes: se lanzan todas a la vez y se espera cada resultado
+        with ThreadPoolExecutor(max_workers=len(statuses)) as executor:
+            futures = {
+                status: executor.submit(count_posts_by_status, client, status)
+                for status in statuses
+            }
+        results = {}
+        for status, future in futures.items():
+            try:
+                results[status] = future.result()
+            except Exception as e:
+                results[status] = e
+        if not any(isinstance(result, Exception) for result in results.values()):
+            _status_counts_cache = (time_bucket, results)
+
     for status in statuses:
-        try:
-            # Query compatible con índice: status + platform + created_at
-            query = (
-                client.collection(COLLECTION)
-                .where("status", "==", status)
-                .where("platform", "==", "twitter")
-            )
-
-            docs = list(query.stream())
-            count = len(docs)
-            status_counts[status] = count
-            total += count
-            print(f"  {status}: {count}")
-
-        except Exception as e:
-            print(f"  {status}: Error - {e}")
+        result = results[status]
+        if isinstance(result, Exception):
+            print(f"  {status}: Error - {result}")
             status_counts[status] = 0
+        else:
+            status_counts[status] = result
+            total += result
+            print(f"  {status}: {result}")
 
     print("-" * 60)
     print(f"Total posts de Twitter con status != 'done': {total}")
@@ -91,7 +131,7 @@ for status in ["noreplies", "skipped"]:
         .where("status", "==", status)
         .where("platform", "==", "twitter")
     )
-    count = len(list(query.stream()))
+    count = query.count().get()[0][0].value
     total += count
 
 print(f"Total: {total}")
@@ -20,12 +20,19 @@ Usage:
 
     # Limit number of jobs to reactivate
     poetry run python scripts/reactivate_empty_result_jobs_from_log.py errors.json --limit 10
+
+    # Large logs: reactivate with a single Firestore BulkWriter
+    poetry run python scripts/reactivate_empty_result_jobs_from_log.py errors.json --no-dry-run --bulk
 """
 
 import argparse
+import codecs
 import json
 import os
 import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from itertools import chain, islice
 from typing import Any
 
 try:
@@ -35,23 +42,92 @@ except ImportError:
     print("Install it with: poetry add python-dotenv", file=sys.stderr)
     sys.exit(1)
 
-# Add src to path to import trust_api modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+# orjson is optional: faster JSON parsing/output when installed, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
+# ijson is optional: streams the errors array instead of parsing the whole log in memory
 try:
-    from trust_api.scrapping_tools.services import retry_job_from_empty_result
-except ImportError as e:
-    print(f"Error importing modules: {e}", file=sys.stderr)
-    print(
-        "Make sure you're running from the project root and dependencies are installed.",
-        file=sys.stderr,
-    )
-    sys.exit(1)
+    import ijson
+except ImportError:
+    ijson = None
+
+# Malformed input raises ValueError (json/orjson) or ijson.JSONError when streaming
+JSON_ERRORS: tuple[type[Exception], ...] = (ValueError,)
+if ijson is not None:
+    JSON_ERRORS += (ijson.JSONError,)
+
+# rbloom is optional: only needed for --bloom-capacity (approximate dedup of huge logs)
+try:
+    from rbloom import Bloom
+except ImportError:
+    Bloom = None
+
+# Add src to path to import trust_api modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 load_dotenv()
 
+# Each reactivation is an independent Firestore transaction, so they are run
+# concurrently; submissions are chunked to bound the number of in-flight RPCs.
+MAX_WORKERS = 32
+SUBMIT_CHUNK_SIZE = 500
+
+# False positive rate of the Bloom filter used with --bloom-capacity
+BLOOM_FALSE_POSITIVE_RATE = 1e-6
+
 
-def load_errors_from_json(json_path: str | None) -> list[dict[str, Any]]:
+def load_service(name: str):
+    """
+    Import a function from trust_api.scrapping_tools.services on demand.
+
+    The services module loads the API settings and the Firestore/GCS clients, so it is
+    only imported when reactivations are actually executed (not for --help or dry runs).
+    """
+    try:
+        from trust_api.scrapping_tools import services
+    except ImportError as e:
+        print(f"Error importing modules: {e}", file=sys.stderr)
+        print(
+            "Make sure you're running from the project root and dependencies are installed.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return getattr(services, name)
+
+
+def iter_errors_streaming(f) -> Iterator[dict[str, Any]]:
+    """Stream error objects from a binary JSON file object with ijson."""
+    # ijson rejects a UTF-8 BOM (which json.loads accepts), so it is skipped here
+    if f.peek(len(codecs.BOM_UTF8)).startswith(codecs.BOM_UTF8):
+        f.read(len(codecs.BOM_UTF8))
+    parse_events = ijson.parse(f, use_float=True)
+    # The first event tells the top-level container apart, however much whitespace
+    # precedes it
+    first = next(parse_events)
+    if first[1] == "start_array":
+        yield from ijson.items(chain([first], parse_events), "item")
+        return
+
+    found_errors = False
+
+    def events():
+        nonlocal found_errors
+        yield first
+        for prefix, event, value in parse_events:
+            if prefix == "" and event == "map_key" and value == "errors":
+                found_errors = True
+            yield prefix, event, value
+
+    if first[1] == "start_map":
+        yield from ijson.items(events(), "errors.item")
+    if not found_errors:
+        raise ValueError("JSON must be an object with 'errors' key or an array of error objects")
+
+
+def load_errors_from_json(json_path: str | None) -> Iterator[dict[str, Any]]:
     """
     Load errors from JSON file or stdin.
 
@@ -59,48 +135,87 @@ def load_errors_from_json(json_path: str | None) -> list[dict[str, Any]]:
     - Object with "errors" key (e.g. process-jobs execution log)
     - Array of error objects
 
-    Returns:
-        List of error objects
+    With ijson installed the errors are streamed one by one, so the log is never held in
+    memory and unrelated top-level fields are not materialized; otherwise the whole
+    document is parsed (orjson or stdlib json).
+
+    Yields:
+        Error objects
     """
     if json_path == "-" or json_path is None:
-        data = json.load(sys.stdin)
+        f = sys.stdin.buffer
     else:
-        with open(json_path, "r", encoding="utf-8") as f:
-            data = json.load(f)
+        f = open(json_path, "rb")
+
+    try:
+        if ijson is not None:
+            yield from iter_errors_streaming(f)
+            return
+        raw = f.read()
+    finally:
+        if f is not sys.stdin.buffer:
+            f.close()
+    data = orjson.loads(raw) if orjson is not None else json.loads(raw)
 
     if isinstance(data, dict) and "errors" in data:
-        return data["errors"]
-    if isinstance(data, list):
-        return data
-    raise ValueError("JSON must be an object with 'errors' key or an array of error objects")
+        yield from data["errors"]
+    elif isinstance(data, list):
+        yield from data
+    else:
+        raise ValueError("JSON must be an object with 'errors' key or an array of error objects")
+
 
+def dumps_json(obj: Any) -> str:
+    """Serialize obj as indented JSON, using orjson when available."""
+    if orjson is not None:
+        return orjson.dumps(
+            obj,
+            option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS,
+            default=str,
+        ).decode()
+    return json.dumps(obj, ensure_ascii=False, indent=2, default=str)
 
-def filter_empty_result_errors(errors: list[dict[str, Any]]) -> list[dict[str, Any]]:
-    """Filter errors to only those with error_type='empty_result', platform='instagram', and valid job_doc_id."""
-    filtered = []
-    seen_job_doc_ids: set[str] = set()
+
+def filter_empty_result_errors(
+    errors: Iterable[dict[str, Any]], bloom_capacity: int | None = None
+) -> Iterator[dict[str, Any]]:
+    """Yield errors with error_type='empty_result', platform='instagram', and a valid job_doc_id.
+
+    Errors are deduplicated by job_doc_id, keeping the first occurrence. With
+    bloom_capacity, seen IDs are tracked in a Bloom filter sized for that many jobs
+    (~30 bits per job instead of a string per job); a false positive, at a rate of
+    BLOOM_FALSE_POSITIVE_RATE, skips a job that was not seen yet.
+    """
+    if bloom_capacity:
+        if Bloom is None:
+            raise ValueError("--bloom-capacity requires rbloom (poetry install --extras scripts)")
+        seen_job_doc_ids = Bloom(bloom_capacity, BLOOM_FALSE_POSITIVE_RATE)
+    else:
+        seen_job_doc_ids = set()
+    seen_add = seen_job_doc_ids.add
 
     for e in errors:
-        if e.get("error_type") != "empty_result":
+        get = e.get
+        if get("error_type") != "empty_result":
             continue
-        if (e.get("platform") or "").lower() != "instagram":
+        platform = get("platform")
+        # Most logs already use lowercase, so only call .lower() when needed
+        if platform != "instagram" and (not platform or platform.lower() != "instagram"):
             continue
-        job_doc_id = e.get("job_doc_id", "").strip()
-        if not job_doc_id:
+        job_doc_id = get("job_doc_id", "").strip()
+        if not job_doc_id or job_doc_id in seen_job_doc_ids:
             continue
-        # Deduplicate by job_doc_id
-        if job_doc_id in seen_job_doc_ids:
-            continue
-        seen_job_doc_ids.add(job_doc_id)
-        filtered.append(e)
-
-    return filtered
+        seen_add(job_doc_id)
+        yield e
 
 
 def reactivate_empty_result_jobs_from_log(
     json_path: str | None = None,
     dry_run: bool = True,
     limit: int | None = None,
+    max_workers: int = MAX_WORKERS,
+    bulk: bool = False,
+    bloom_capacity: int | None = None,
 ) -> dict[str, Any]:
     """
     Reactivate jobs with empty_result from execution log (platform=instagram only).
@@ -109,66 +224,99 @@ def reactivate_empty_result_jobs_from_log(
         json_path: Path to JSON file, or "-" for stdin, or None for stdin
         dry_run: If True, don't update Firestore, only report what would be done
         limit: Maximum number of jobs to reactivate (None for all)
+        max_workers: Number of reactivations run concurrently (ignored in dry-run)
+        bulk: If True, reactivate all jobs with a single Firestore BulkWriter
+            (retry_jobs_from_empty_result_bulk) instead of one transaction per job
+        bloom_capacity: Expected number of jobs in the log; if set, job_doc_ids are
+            deduplicated with a Bloom filter of that capacity instead of a set
 
     Returns:
         Dictionary with results and summary
     """
     errors = load_errors_from_json(json_path)
-    empty_result_errors = filter_empty_result_errors(errors)
+    empty_result_errors = filter_empty_result_errors(errors, bloom_capacity)
 
     if limit is not None and limit > 0:
-        empty_result_errors = empty_result_errors[:limit]
+        empty_result_errors = list(islice(empty_result_errors, limit))
+    else:
+        empty_result_errors = list(empty_result_errors)
 
     print(
         f"Found {len(empty_result_errors)} unique empty_result instagram jobs to reactivate",
         file=sys.stderr,
     )
 
-    processed = []
-    reactivated_count = 0
-    error_count = 0
-
-    for err in empty_result_errors:
-        job_doc_id = err["job_doc_id"]
-        post_id = err.get("post_id", "?")
-        platform = err.get("platform", "?")
-        country = err.get("country", "?")
-        candidate_id = err.get("candidate_id", "?")
-
-        item = {
-            "job_doc_id": job_doc_id,
-            "post_id": post_id,
-            "platform": platform,
-            "country": country,
-            "candidate_id": candidate_id,
+    processed = [
+        {
+            "job_doc_id": err["job_doc_id"],
+            "post_id": err.get("post_id", "?"),
+            "platform": err.get("platform", "?"),
+            "country": err.get("country", "?"),
+            "candidate_id": err.get("candidate_id", "?"),
             "reactivated": False,
             "error": None,
         }
+        for err in empty_result_errors
+    ]
+    reactivated_count = 0
+    error_count = 0
 
-        try:
-            if dry_run:
-                print(
-                    f"[DRY RUN] Would reactivate job {job_doc_id} (post_id={post_id}, "
-                    f"{platform}/{country}/{candidate_id})",
-                    file=sys.stderr,
+    if dry_run:
+        # One stderr write per chunk of jobs instead of one print per job
+        for start in range(0, len(processed), SUBMIT_CHUNK_SIZE):
+            chunk = processed[start : start + SUBMIT_CHUNK_SIZE]
+            sys.stderr.write(
+                "".join(
+                    f"[DRY RUN] Would reactivate job {item['job_doc_id']} "
+                    f"(post_id={item['post_id']}, "
+                    f"{item['platform']}/{item['country']}/{item['candidate_id']})\n"
+                    for item in chunk
                 )
+            )
+            for item in chunk:
                 item["reactivated"] = True
-                reactivated_count += 1
-            else:
-                new_retry_count = retry_job_from_empty_result(job_doc_id)
+            reactivated_count += len(chunk)
+    elif bulk:
+        retry_jobs_from_empty_result_bulk = load_service("retry_jobs_from_empty_result_bulk")
+        retry_counts, bulk_errors = retry_jobs_from_empty_result_bulk(
+            [item["job_doc_id"] for item in processed]
+        )
+        for item in processed:
+            job_doc_id = item["job_doc_id"]
+            if job_doc_id in retry_counts:
                 item["reactivated"] = True
-                item["new_retry_count"] = new_retry_count
+                item["new_retry_count"] = retry_counts[job_doc_id]
                 reactivated_count += 1
-                print(
-                    f"✓ Reactivated job {job_doc_id} (post_id={post_id}) -> pending (retry #{new_retry_count})",
-                    file=sys.stderr,
-                )
-        except Exception as e:
-            item["error"] = str(e)
-            error_count += 1
-            print(f"✗ Error reactivating job {job_doc_id}: {e}", file=sys.stderr)
-
-        processed.append(item)
+            else:
+                item["error"] = bulk_errors.get(job_doc_id, "Job was not reactivated")
+                error_count += 1
+                print(f"✗ Error reactivating job {job_doc_id}: {item['error']}", file=sys.stderr)
+        print(f"✓ Reactivated {reactivated_count} jobs -> pending (bulk)", file=sys.stderr)
+    else:
+        retry_job_from_empty_result = load_service("retry_job_from_empty_result")
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for start in range(0, len(processed), SUBMIT_CHUNK_SIZE):
+                futures = {
+                    executor.submit(retry_job_from_empty_result, item["job_doc_id"]): item
+                    for item in processed[start : start + SUBMIT_CHUNK_SIZE]
+                }
+                for future in as_completed(futures):
+                    item = futures[future]
+                    job_doc_id = item["job_doc_id"]
+                    try:
+                        new_retry_count = future.result()
+                    except Exception as e:
+                        item["error"] = str(e)
+                        error_count += 1
+                        print(f"✗ Error reactivating job {job_doc_id}: {e}", file=sys.stderr)
+                        continue
+                    item["reactivated"] = True
+                    item["new_retry_count"] = new_retry_count
+                    reactivated_count += 1
+                    print(
+                        f"✓ Reactivated job {job_doc_id} (post_id={item['post_id']}) -> pending (retry #{new_retry_count})",
+                        file=sys.stderr,
+                    )
 
     return {
         "jobs": processed,
@@ -202,6 +350,25 @@ def main() -> int:
         default=None,
         help="Maximum number of jobs to reactivate (default: all)",
     )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=MAX_WORKERS,
+        help=f"Number of reactivations run concurrently (default: {MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--bulk",
+        action="store_true",
+        help="Reactivate all jobs with a single Firestore BulkWriter instead of one "
+        "transaction per job",
+    )
+    parser.add_argument(
+        "--bloom-capacity",
+        type=int,
+        default=None,
+        help="For very large logs: deduplicate job_doc_ids with a Bloom filter sized for "
+        "this many jobs (needs rbloom; approximate, may skip a few jobs)",
+    )
 
     args = parser.parse_args()
 
@@ -224,8 +391,11 @@ def main() -> int:
             json_path=json_path,
             dry_run=not args.no_dry_run,
             limit=args.limit,
+            max_workers=args.max_workers,
+            bulk=args.bulk,
+            bloom_capacity=args.bloom_capacity,
         )
-    except ValueError as e:
+    except JSON_ERRORS as e:
         print(f"Error: {e}", file=sys.stderr)
         return 1
     except FileNotFoundError as e:
@@ -242,7 +412,7 @@ def main() -> int:
     print(f"Reactivated: {results['summary']['reactivated']}", file=sys.stderr)
     print(f"Errors: {results['summary']['errors']}", file=sys.stderr)
 
-    print(json.dumps(results, indent=2, default=str))
+    print(dumps_json(results))
     return 1 if results["summary"]["errors"] > 0 else 0
 
 
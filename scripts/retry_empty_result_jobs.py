@@ -4,9 +4,11 @@ Script to retry jobs with status='empty_result' by moving them to 'pending' stat
 
 This script:
 1. Queries Firestore for jobs with status='empty_result'
-2. Moves them to 'pending' status using retry_job_from_empty_result()
+2. Moves them to 'pending' status with a Firestore BulkWriter (reopen_jobs_bulk() from
+   trust_api.scrapping_tools.services, without one round-trip per job)
 3. Increments retry_count automatically
-4. Ensures logs will show these as retries when processed
+4. Moves their posts from 'done' to 'noreplies' so they can be reprocessed
+5. Ensures logs will show these as retries when processed
 
 The script reads configuration from .env file or environment variables:
     GCP_PROJECT_ID: GCP project ID
@@ -23,14 +25,20 @@ Usage:
     # Retry for specific candidate
     poetry run python scripts/retry_empty_result_jobs.py --candidate-id hnd01monc
 
-    # Dry run (show what would be retried)
+    # Dry run (show what would be retried; lists the first 100 jobs and counts the rest)
     poetry run python scripts/retry_empty_result_jobs.py --dry-run
+
+    # Dry run listing every job (one read per job)
+    poetry run python scripts/retry_empty_result_jobs.py --dry-run --preview-limit 0
 """
 
 import argparse
+import json
 import os
 import sys
-from typing import Any
+from collections.abc import Iterator
+from functools import lru_cache
+from typing import TYPE_CHECKING, Any
 
 try:
     from dotenv import load_dotenv
@@ -39,43 +47,94 @@ except ImportError:
     print("Install it with: poetry add python-dotenv")
     sys.exit(1)
 
-# Add src to path to import trust_api modules
-sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
-
-try:
+if TYPE_CHECKING:
     from google.cloud import firestore
 
-    from trust_api.scrapping_tools.services import retry_job_from_empty_result
-except ImportError as e:
-    print(f"Error importing modules: {e}", file=sys.stderr)
-    print(
-        "Make sure you're running from the project root and dependencies are installed.",
-        file=sys.stderr,
-    )
-    sys.exit(1)
+# orjson is optional: faster JSON output when installed, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 # Load environment variables from .env file
 load_dotenv()
 
+# Add src to path to import trust_api modules
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
+
+# Jobs fetched per query page
+PAGE_SIZE = 500
+
+# Jobs listed by --dry-run unless --preview-limit says otherwise
+DEFAULT_PREVIEW_LIMIT = 100
 
+
+@lru_cache(maxsize=8)
 def get_firestore_client(
     project_id: str | None = None, database_name: str = "socialnetworks"
-) -> firestore.Client:
-    """Initialize and return Firestore client."""
+) -> "firestore.Client":
+    """
+    Initialize and return Firestore client (cached per project/database).
+
+    google-cloud-firestore is imported here rather than at module level, so importing
+    this module or running --help does not pay for loading gRPC and credentials.
+    """
+    try:
+        from google.cloud import firestore
+    except ImportError as e:
+        print(f"Error importing modules: {e}", file=sys.stderr)
+        print(
+            "Make sure you're running from the project root and dependencies are installed.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+
     if project_id:
         return firestore.Client(project=project_id, database=database_name)
     return firestore.Client(database=database_name)
 
 
+def build_empty_result_query(
+    client: "firestore.Client", collection: str, candidate_id: str | None = None
+) -> "firestore.Query":
+    """Return the query for jobs with status='empty_result' (optionally for one candidate)."""
+    query = client.collection(collection).where("status", "==", "empty_result")
+    if candidate_id:
+        query = query.where("candidate_id", "==", candidate_id)
+    return query
+
+
+def count_empty_result_jobs(
+    collection: str = "pending_jobs",
+    database_name: str = "socialnetworks",
+    project_id: str | None = None,
+    candidate_id: str | None = None,
+) -> int:
+    """
+    Count jobs with status='empty_result' using a server-side COUNT aggregation.
+
+    Returns:
+        Number of jobs (costs a single aggregation read instead of one read per job)
+    """
+    client = get_firestore_client(project_id, database_name)
+    query = build_empty_result_query(client, collection, candidate_id)
+    return query.count().get()[0][0].value
+
+
 def query_empty_result_jobs(
     collection: str = "pending_jobs",
     database_name: str = "socialnetworks",
     project_id: str | None = None,
     candidate_id: str | None = None,
     limit: int | None = None,
-) -> list[dict[str, Any]]:
+) -> Iterator[dict[str, Any]]:
     """
-    Query Firestore for jobs with status='empty_result'.
+    Query Firestore for jobs with status='empty_result', oldest update first.
+
+    Jobs are fetched in pages of PAGE_SIZE chained with query cursors and yielded as they
+    arrive, so the full backlog is never held in memory. Requires the composite indexes
+    pending_jobs (status, updated_at) and (status, candidate_id, updated_at), see
+    scripts/create_firestore_indexes.sh.
 
     Args:
         collection: Firestore collection name (default: "pending_jobs")
@@ -84,29 +143,50 @@ def query_empty_result_jobs(
         candidate_id: Optional candidate_id to filter jobs
         limit: Maximum number of results to return (None for all)
 
-    Returns:
-        List of job documents with all fields, including '_doc_id' field with Firestore document ID
+    Yields:
+        Job documents with all fields, including '_doc_id' field with Firestore document ID
     """
     client = get_firestore_client(project_id, database_name)
-    query = (
-        client.collection(collection).where("status", "==", "empty_result").order_by("updated_at")
-    )
-
-    if candidate_id:
-        query = query.where("candidate_id", "==", candidate_id)
-
-    if limit:
-        docs = query.limit(limit).stream()
-    else:
-        docs = query.stream()
-
-    jobs = []
-    for doc in docs:
-        doc_data = doc.to_dict()
-        doc_data["_doc_id"] = doc.id  # Store document ID
-        jobs.append(doc_data)
+    query = build_empty_result_query(client, collection, candidate_id).order_by("updated_at")
+
+    cursor = None
+    remaining = limit
+    while remaining is None or remaining > 0:
+        page_limit = PAGE_SIZE if remaining is None else min(PAGE_SIZE, remaining)
+        page_query = query.limit(page_limit)
+        if cursor is not None:
+            page_query = page_query.start_after(cursor)
+
+        snapshots = list(page_query.stream())
+        for doc in snapshots:
+            doc_data = doc.to_dict()
+            doc_data["_doc_id"] = doc.id  # Store document ID
+            yield doc_data
+
+        if len(snapshots) < page_limit:
+            break
+        cursor = snapshots[-1]
+        if remaining is not None:
+            remaining -= len(snapshots)
+
+
+def load_reopen_jobs_bulk():
+    """
+    Import reopen_jobs_bulk from trust_api.scrapping_tools.services on demand.
 
-    return jobs
+    The services module loads the API settings and the Firestore/GCS clients, so it is
+    only imported when jobs are actually retried (not for --help or dry runs).
+    """
+    try:
+        from trust_api.scrapping_tools.services import reopen_jobs_bulk
+    except ImportError as e:
+        print(f"Error importing modules: {e}", file=sys.stderr)
+        print(
+            "Make sure you're running from the project root and dependencies are installed.",
+            file=sys.stderr,
+        )
+        sys.exit(1)
+    return reopen_jobs_bulk
 
 
 def retry_empty_result_jobs(
@@ -116,6 +196,8 @@ def retry_empty_result_jobs(
     candidate_id: str | None = None,
     limit: int | None = None,
     dry_run: bool = False,
+    posts_collection: str = "posts",
+    preview_limit: int | None = None,
 ) -> dict[str, Any]:
     """
     Retry empty_result jobs by moving them to pending status.
@@ -127,6 +209,9 @@ def retry_empty_result_jobs(
         candidate_id: Optional candidate_id to filter jobs
         limit: Maximum number of jobs to retry (None for all)
         dry_run: If True, don't update Firestore, only report what would be retried
+        posts_collection: Firestore posts collection name (default: "posts")
+        preview_limit: With dry_run, maximum number of jobs to read and list (None for no
+            cap); the total is then reported with a COUNT aggregation instead
 
     Returns:
         Dictionary containing results with jobs and summary statistics
@@ -138,11 +223,26 @@ def retry_empty_result_jobs(
     )
     if candidate_id:
         print(f"Filtering by candidate_id: {candidate_id}", file=sys.stderr)
-    jobs = query_empty_result_jobs(jobs_collection, database_name, project_id, candidate_id, limit)
-    print(f"Found {len(jobs)} jobs with status='empty_result'", file=sys.stderr)
+
+    # A dry run only needs a sample: cap the documents read and count the rest server-side
+    total_matching = None
+    scan_limit = limit
+    if dry_run and preview_limit is not None:
+        scan_limit = preview_limit if limit is None else min(limit, preview_limit)
+        total_matching = count_empty_result_jobs(
+            jobs_collection, database_name, project_id, candidate_id
+        )
+        if limit is not None:
+            total_matching = min(total_matching, limit)
+
+    jobs = query_empty_result_jobs(
+        jobs_collection, database_name, project_id, candidate_id, scan_limit
+    )
 
     # Process each job
     processed_jobs = []
+    jobs_to_retry = []
+    post_doc_ids: dict[str, str] = {}
     retried_count = 0
     error_count = 0
 
@@ -175,42 +275,81 @@ def retry_empty_result_jobs(
             processed_jobs.append(processed_job)
             continue
 
+        if dry_run:
+            print(
+                f"[DRY RUN] Would retry job {doc_id} (job_id={job_id}, post_id={post_id}) "
+                f"from empty_result to pending (retry #{processed_job['new_retry_count']})",
+                file=sys.stderr,
+            )
+            processed_job["retried"] = True
+            retried_count += 1
+        else:
+            jobs_to_retry.append(processed_job)
+            if job.get("post_doc_id"):
+                post_doc_ids[doc_id] = job["post_doc_id"]
+
+        processed_jobs.append(processed_job)
+
+    if total_matching is None:
+        print(f"Found {len(processed_jobs)} jobs with status='empty_result'", file=sys.stderr)
+    else:
+        print(
+            f"Showing first {len(processed_jobs)} of {total_matching} jobs "
+            "with status='empty_result'",
+            file=sys.stderr,
+        )
+
+    if jobs_to_retry:
+        client = get_firestore_client(project_id, database_name)
+        reopen_jobs_bulk = load_reopen_jobs_bulk()
+        retry_counts = {job["doc_id"]: job["new_retry_count"] for job in jobs_to_retry}
         try:
-            if dry_run:
-                print(
-                    f"[DRY RUN] Would retry job {doc_id} (job_id={job_id}, post_id={post_id}) "
-                    f"from empty_result to pending (retry #{processed_job['new_retry_count']})",
-                    file=sys.stderr,
-                )
-                processed_job["retried"] = True
-                retried_count += 1
+            failed_jobs = reopen_jobs_bulk(
+                client,
+                client.collection(jobs_collection),
+                client.collection(posts_collection),
+                retry_counts,
+                post_doc_ids,
+            )
+        except Exception as e:
+            failed_jobs = {processed_job["doc_id"]: str(e) for processed_job in jobs_to_retry}
+
+        for processed_job in jobs_to_retry:
+            doc_id = processed_job["doc_id"]
+            if doc_id in failed_jobs:
+                processed_job["error"] = f"Error retrying job: {failed_jobs[doc_id]}"
+                error_count += 1
+                print(f"✗ Error retrying job {doc_id}: {failed_jobs[doc_id]}", file=sys.stderr)
             else:
-                # Use the helper function to retry the job
-                new_retry_count = retry_job_from_empty_result(doc_id)
-                processed_job["new_retry_count"] = new_retry_count
                 processed_job["retried"] = True
                 retried_count += 1
                 print(
-                    f"✓ Retried job {doc_id} (job_id={job_id}, post_id={post_id}) "
-                    f"from empty_result to pending (retry #{new_retry_count})",
+                    f"✓ Retried job {doc_id} (job_id={processed_job['job_id']}, "
+                    f"post_id={processed_job['post_id']}) from empty_result to pending "
+                    f"(retry #{processed_job['new_retry_count']})",
                     file=sys.stderr,
                 )
-        except Exception as e:
-            error_msg = f"Error retrying job: {str(e)}"
-            processed_job["error"] = error_msg
-            error_count += 1
-            print(f"✗ Error retrying job {doc_id}: {e}", file=sys.stderr)
 
-        processed_jobs.append(processed_job)
-
-    return {
-        "jobs": processed_jobs,
-        "summary": {
-            "total_empty_result_jobs": len(jobs),
-            "retried": retried_count,
-            "errors": error_count,
-        },
+    summary = {
+        "total_empty_result_jobs": len(processed_jobs),
+        "retried": retried_count,
+        "errors": error_count,
     }
+    if total_matching is not None:
+        summary["total_matching_jobs"] = total_matching
+        summary["preview_truncated"] = len(processed_jobs) < total_matching
+
+    return {"jobs": processed_jobs, "summary": summary}
+
+
+def dumps_json(obj: Any, compact: bool = False) -> bytes:
+    """Serialize obj as UTF-8 JSON (indented unless compact), using orjson when available."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option, default=str)
+    return json.dumps(obj, ensure_ascii=False, indent=None if compact else 2, default=str).encode()
 
 
 def main():
@@ -233,6 +372,11 @@ def main():
         default=None,
         help="GCP project ID (default: from environment or gcloud config)",
     )
+    parser.add_argument(
+        "--posts-collection",
+        default="posts",
+        help="Firestore posts collection name (default: posts)",
+    )
     parser.add_argument(
         "--candidate-id",
         default=None,
@@ -249,6 +393,18 @@ def main():
         action="store_true",
         help="Show what would be retried without actually updating Firestore",
     )
+    parser.add_argument(
+        "--preview-limit",
+        type=int,
+        default=DEFAULT_PREVIEW_LIMIT,
+        help="With --dry-run, only read and list this many jobs and report the total with a "
+        f"single COUNT aggregation read; 0 lists every job (default: {DEFAULT_PREVIEW_LIMIT})",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Print the JSON results without indentation (faster, for pipelines)",
+    )
 
     args = parser.parse_args()
 
@@ -268,6 +424,8 @@ def main():
         candidate_id=args.candidate_id,
         limit=args.limit,
         dry_run=args.dry_run,
+        posts_collection=args.posts_collection,
+        preview_limit=args.preview_limit or None,
     )
 
     # Print summary
@@ -278,13 +436,18 @@ def main():
         f"Total empty_result jobs found: {results['summary']['total_empty_result_jobs']}",
         file=sys.stderr,
     )
+    if results["summary"].get("preview_truncated"):
+        print(
+            f"Preview truncated: {results['summary']['total_matching_jobs']} jobs would be "
+            "retried (use --preview-limit 0 to list all)",
+            file=sys.stderr,
+        )
     print(f"Jobs retried: {results['summary']['retried']}", file=sys.stderr)
     print(f"Errors: {results['summary']['errors']}", file=sys.stderr)
 
     # Print JSON output to stdout for programmatic use
-    import json
-
-    print(json.dumps(results, indent=2, default=str))
+    sys.stdout.flush()
+    sys.stdout.buffer.write(dumps_json(results, compact=args.compact) + b"\n")
 
     # Exit with error code if there were errors
     if results["summary"]["errors"] > 0:
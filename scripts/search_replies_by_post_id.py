@@ -9,24 +9,163 @@ Example:
     poetry run python scripts/search_replies_by_post_id.py 3776855243175861385
     poetry run python scripts/search_replies_by_post_id.py 3776855243175861385 --bucket my-bucket
     poetry run python scripts/search_replies_by_post_id.py 3776855243175861385 --output results.json
+    poetry run python scripts/search_replies_by_post_id.py 3776855243175861385 --name-match-only
+    poetry run python scripts/search_replies_by_post_id.py 3776855243175861385 --use-index
 """
 
 import argparse
 import json
 import os
+import sqlite3
 import sys
+import zlib
+from collections import deque
+from collections.abc import Iterable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
+from itertools import chain, islice
 from typing import Any
 
 from dotenv import load_dotenv
 from google.cloud import storage
 
+# orjson is optional: faster JSON parsing when installed, stdlib json otherwise
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# ijson is optional: replies are streamed from the blob one by one when installed
+try:
+    import ijson
+except ImportError:
+    ijson = None
+
+# Parse errors reported as "Error parsing JSON" (orjson's subclasses json.JSONDecodeError)
+JSON_ERRORS: tuple[type[Exception], ...] = (json.JSONDecodeError,)
+if ijson is not None:
+    JSON_ERRORS += (ijson.JSONError,)
+
+# tqdm is optional: a progress bar when installed, a line every PROGRESS_EVERY files otherwise
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
 load_dotenv()
 
+# Blob downloads are network-bound, so they are run concurrently
+DEFAULT_CONCURRENCY = 32
+
+PROGRESS_EVERY = 100
+
+# Local cache of the post ids each blob replies to (see open_reply_cache)
+DEFAULT_CACHE_DB = os.path.join(os.path.expanduser("~"), ".cache", "trust-engine", "replies.db")
+CACHE_COMMIT_EVERY = 500
+
+# Fields that may hold the id of the post a reply responds to, in priority order
+# (Twitter format first, then Instagram format); the first non-empty one is used
+IN_REPLY_TO_KEYS = (
+    "in_reply_to_status_id_str",
+    "in_reply_to_status_id",
+    "parent_post_pk",
+    "parent_post_id",
+    "parent_id",
+    "original_post_pk",
+)
+
+# The same fields per platform; raw blobs are laid out as
+# raw/{country}/{platform}/{candidate_id}/..., so the platform is known from the name
+PLATFORM_IN_REPLY_TO_KEYS = {
+    "twitter": ("in_reply_to_status_id_str", "in_reply_to_status_id"),
+    "instagram": ("parent_post_pk", "parent_post_id", "parent_id", "original_post_pk"),
+}
+
+
+def iter_replies(data: dict[str, Any] | list[Any]) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Yield (index, reply) for each reply dict in a raw-layer JSON document.
+
+    Accepts a list of replies, a dict with a 'data' key (list or single reply), or a dict
+    that is itself a single reply.
+    """
+    replies_list: list[Any] = []
+
+    if isinstance(data, list):
+        replies_list = data
+    elif isinstance(data, dict):
+        # Check if there's a 'data' key
+        if "data" in data:
+            if isinstance(data["data"], list):
+                replies_list = data["data"]
+            else:
+                replies_list = [data["data"]]
+        else:
+            # Treat the dict itself as a single reply
+            replies_list = [data]
+
+    for idx, reply in enumerate(replies_list):
+        if isinstance(reply, dict):
+            yield idx, reply
+
+
+class UnstreamableLayoutError(Exception):
+    """The JSON document is not a list of replies nor an object with a 'data' list."""
+
+
+def iter_replies_streaming(f) -> Iterator[tuple[int, dict[str, Any]]]:
+    """
+    Stream (index, reply) pairs from a binary JSON file object with ijson.
+
+    Only one reply is materialized at a time. Handles a top-level list of replies and an
+    object whose 'data' key is a list (the layout written by save_to_gcs); any other
+    layout raises UnstreamableLayoutError so the caller can parse the whole document.
+    """
+    events = ijson.parse(f, use_float=True)
+    first = next(events, None)
+    if first is None:
+        return
+    if first[1] == "start_array":
+        replies = ijson.items(chain((first,), events), "item")
+    else:
+        data_event = None
+
+        def tracked_events():
+            nonlocal data_event
+            for prefix, event, value in chain((first,), events):
+                if prefix == "data" and data_event is None:
+                    data_event = event
+                yield prefix, event, value
+
+        replies = ijson.items(tracked_events(), "data.item")
+
+    for idx, reply in enumerate(replies):
+        if isinstance(reply, dict):
+            yield idx, reply
+
+    if first[1] != "start_array" and data_event != "start_array":
+        raise UnstreamableLayoutError
+
+
+def in_reply_to_keys_for(blob_name: str) -> tuple[str, ...]:
+    """Return the in-reply-to fields to check for a blob (all of them if no platform is known)."""
+    for part in blob_name.split("/"):
+        keys = PLATFORM_IN_REPLY_TO_KEYS.get(part)
+        if keys is not None:
+            return keys
+    return IN_REPLY_TO_KEYS
+
+
+def get_in_reply_to(reply: dict[str, Any], keys: tuple[str, ...] = IN_REPLY_TO_KEYS) -> Any:
+    """Return the id of the post a reply responds to (first non-empty field among keys)."""
+    get = reply.get
+    return next((value for key in keys if (value := get(key))), None)
+
 
 def search_replies_in_json(
     data: dict[str, Any] | list[Any],
     post_id: str,
     blob_name: str,
+    include_full_reply: bool = False,
 ) -> list[dict[str, Any]]:
     """
     Search for replies to a specific post_id in a JSON data structure.
@@ -35,6 +174,30 @@ def search_replies_in_json(
         data: JSON data (can be dict, list, or dict with 'data' key)
         post_id: Post ID to search for in replies
         blob_name: Name of the blob/file being searched
+        include_full_reply: If True, each match also carries the complete reply object
+
+    Returns:
+        List of matching replies with metadata
+    """
+    return scan_replies(iter_replies(data), post_id, blob_name, include_full_reply)
+
+
+def scan_replies(
+    replies: Iterable[tuple[int, dict[str, Any]]],
+    post_id: str,
+    blob_name: str,
+    include_full_reply: bool = False,
+    parent_ids: set[str] | None = None,
+) -> list[dict[str, Any]]:
+    """
+    Return the replies to post_id among (index, reply) pairs, in a single pass.
+
+    Args:
+        replies: (index, reply) pairs, from iter_replies() or iter_replies_streaming()
+        post_id: Post ID to search for in replies
+        blob_name: Name of the blob/file being searched
+        include_full_reply: If True, each match also carries the complete reply object
+        parent_ids: If given, every string post id replied to is added to it (reply cache)
 
     Returns:
         List of matching replies with metadata
@@ -45,77 +208,198 @@ def search_replies_in_json(
     # In that case, all replies in the file are replies to that post
     is_post_file = blob_name.endswith(f"/{post_id}.json")
 
-    # Handle different data structures
-    replies_list: list[dict[str, Any]] = []
+    # Only the fields of the blob's platform are checked in the loop
+    keys = in_reply_to_keys_for(blob_name)
 
-    if isinstance(data, list):
-        replies_list = data
-    elif isinstance(data, dict):
-        # Check if there's a 'data' key
-        if "data" in data:
-            if isinstance(data["data"], list):
-                replies_list = data["data"]
-            else:
-                replies_list = [data["data"]]
-        else:
-            # Treat the dict itself as a single reply
-            replies_list = [data]
+    # Ids are stored as strings (id_str) or as numbers (e.g. in_reply_to_status_id)
+    post_id_int = int(post_id) if post_id.isdigit() else None
 
     # Search through replies
-    for idx, reply in enumerate(replies_list):
-        if not isinstance(reply, dict):
-            continue
+    for idx, reply in replies:
+        in_reply_to = get_in_reply_to(reply, keys)
+        if parent_ids is not None and isinstance(in_reply_to, str | int):
+            parent_ids.add(str(in_reply_to))
 
         # If this is the post's own file, all replies are matches
         if is_post_file:
-            is_match = True
+            in_reply_to = post_id
+        elif in_reply_to != post_id and (post_id_int is None or in_reply_to != post_id_int):
+            continue
+
+        # This reply is responding to the target post_id
+        user = reply.get("user")
+        if not isinstance(user, dict):
+            user = {}
+        match = {
+            "blob_name": blob_name,
+            "reply_index": idx,
+            "reply_id": reply.get("id_str") or reply.get("id") or reply.get("tweet_id"),
+            "in_reply_to_status_id_str": in_reply_to,
+            "created_at": reply.get("created_at"),
+            "full_text": reply.get("full_text") or reply.get("text", "")[:200],  # First 200 chars
+            "user": {
+                "screen_name": user.get("screen_name"),
+                "name": user.get("name"),
+                "id_str": user.get("id_str"),
+            },
+            "engagement": {
+                "favorite_count": reply.get("favorite_count", 0),
+                "retweet_count": reply.get("retweet_count", 0),
+                "reply_count": reply.get("reply_count", 0),
+            },
+        }
+        if include_full_reply:
+            match["full_reply"] = reply
+        matches.append(match)
+
+    return matches
+
+
+def search_blob(
+    blob: storage.Blob,
+    post_id: str,
+    include_full_reply: bool = False,
+    index_replies: bool = False,
+) -> tuple[list[dict[str, Any]], set[str] | None]:
+    """
+    Download and parse one JSON blob and return the replies to post_id it contains.
+
+    With ijson installed the blob is streamed and searched reply by reply, so only the
+    matches outlive the call and the document is never held in memory as a whole.
+
+    Returns:
+        Tuple (matches, parent_ids); parent_ids is the set of post ids replied to in the
+        blob when index_replies is True (for the reply cache), None otherwise
+    """
+    if ijson is not None:
+        parent_ids = set() if index_replies else None
+        try:
+            with blob.open("rb") as f:
+                matches = scan_replies(
+                    iter_replies_streaming(f), post_id, blob.name, include_full_reply, parent_ids
+                )
+            return matches, parent_ids
+        except UnstreamableLayoutError:
+            pass  # Rare layout (single reply object): parse the whole document below
+
+    parent_ids = set() if index_replies else None
+    # Raw bytes go straight to the parser (no separate UTF-8 decode pass)
+    content = blob.download_as_bytes()
+    data = orjson.loads(content) if orjson is not None else json.loads(content)
+    matches = scan_replies(iter_replies(data), post_id, blob.name, include_full_reply, parent_ids)
+    return matches, parent_ids
+
+
+def open_reply_cache(path: str) -> sqlite3.Connection:
+    """
+    Open (creating it if needed) the local reply cache.
+
+    For each blob already downloaded, the cache stores its generation and the set of post
+    ids its replies respond to. A later search for any post_id skips blobs whose cached
+    generation is current and that contain no reply to it, without downloading them.
+    """
+    os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+    conn = sqlite3.connect(path)
+    conn.execute(
+        "CREATE TABLE IF NOT EXISTS blob_replies ("
+        "blob_name TEXT PRIMARY KEY, generation INTEGER, parent_ids BLOB)"
+    )
+    return conn
+
+
+def get_cached_parent_ids(conn: sqlite3.Connection, blob: storage.Blob) -> set[str] | None:
+    """Return the cached parent post ids of blob, or None if it is not cached at its generation."""
+    row = conn.execute(
+        "SELECT generation, parent_ids FROM blob_replies WHERE blob_name = ?", (blob.name,)
+    ).fetchone()
+    if row is None or row[0] != blob.generation:
+        return None
+    return set(json.loads(zlib.decompress(row[1])))
+
+
+def cache_parent_ids(conn: sqlite3.Connection, blob: storage.Blob, parent_ids: set[str]) -> None:
+    """Store the parent post ids of blob at its current generation."""
+    conn.execute(
+        "INSERT OR REPLACE INTO blob_replies (blob_name, generation, parent_ids) VALUES (?, ?, ?)",
+        (blob.name, blob.generation, zlib.compress(json.dumps(sorted(parent_ids)).encode())),
+    )
+
+
+def iter_search_results(
+    executor: ThreadPoolExecutor,
+    blobs: Iterable[storage.Blob],
+    post_id: str,
+    max_in_flight: int,
+    include_full_reply: bool = False,
+    cache: sqlite3.Connection | None = None,
+) -> Iterator[tuple[storage.Blob, Future | None, bool]]:
+    """
+    Submit search_blob for each blob and yield (blob, future, cached) in listing order.
+
+    At most max_in_flight searches are pending at any time, so blobs are consumed from
+    the listing as downloads progress instead of materializing the whole listing first.
+    With a reply cache, blobs known to hold no reply to post_id are not downloaded: they
+    are yielded with future=None. cached tells whether the blob was found in the cache.
+    """
+    post_file_suffix = f"/{post_id}.json"
+    in_flight: deque[tuple[storage.Blob, Future | None, bool]] = deque()
+    for blob in blobs:
+        parent_ids = get_cached_parent_ids(cache, blob) if cache is not None else None
+        if (
+            parent_ids is not None
+            and post_id not in parent_ids
+            and not blob.name.endswith(post_file_suffix)
+        ):
+            future = None
         else:
-            # Check different fields that might contain the post_id being replied to
-            # Twitter format
-            in_reply_to = reply.get("in_reply_to_status_id_str") or reply.get(
-                "in_reply_to_status_id"
+            future = executor.submit(
+                search_blob,
+                blob,
+                post_id,
+                include_full_reply,
+                index_replies=cache is not None and parent_ids is None,
             )
-            # Instagram format
-            if not in_reply_to:
-                in_reply_to = (
-                    reply.get("parent_post_pk")
-                    or reply.get("parent_post_id")
-                    or reply.get("parent_id")
-                    or reply.get("original_post_pk")
-                )
-            is_match = in_reply_to == post_id
-
-        # Check if this reply is responding to the target post_id
-        if is_match:
-            match = {
-                "blob_name": blob_name,
-                "reply_index": idx,
-                "reply_id": reply.get("id_str") or reply.get("id") or reply.get("tweet_id"),
-                "in_reply_to_status_id_str": in_reply_to if not is_post_file else post_id,
-                "created_at": reply.get("created_at"),
-                "full_text": reply.get("full_text")
-                or reply.get("text", "")[:200],  # First 200 chars
-                "user": {
-                    "screen_name": reply.get("user", {}).get("screen_name")
-                    if isinstance(reply.get("user"), dict)
-                    else None,
-                    "name": reply.get("user", {}).get("name")
-                    if isinstance(reply.get("user"), dict)
-                    else None,
-                    "id_str": reply.get("user", {}).get("id_str")
-                    if isinstance(reply.get("user"), dict)
-                    else None,
-                },
-                "engagement": {
-                    "favorite_count": reply.get("favorite_count", 0),
-                    "retweet_count": reply.get("retweet_count", 0),
-                    "reply_count": reply.get("reply_count", 0),
-                },
-                "full_reply": reply,  # Include full reply data
-            }
-            matches.append(match)
+        in_flight.append((blob, future, parent_ids is not None))
+        if len(in_flight) >= max_in_flight:
+            yield in_flight.popleft()
+    while in_flight:
+        yield in_flight.popleft()
 
-    return matches
+
+def list_prefix_tiles(bucket: storage.Bucket, prefix: str, depth: int) -> list[tuple[str, bool]]:
+    """
+    Split prefix into sub-prefix tiles, depth levels down (one delimiter listing per prefix).
+
+    Returns:
+        Sorted (prefix, recursive) tiles covering every object under prefix exactly once:
+        recursive tiles hold everything under a sub-prefix, non-recursive ones only the
+        objects directly in an intermediate prefix (e.g. files in raw/{country}/)
+    """
+    tiles: list[tuple[str, bool]] = []
+    level = [prefix]
+    for _ in range(depth):
+        next_level = []
+        for level_prefix in level:
+            iterator = bucket.list_blobs(prefix=level_prefix, delimiter="/")
+            # Consuming every page is what fills iterator.prefixes
+            has_objects = False
+            for _blob in iterator:
+                has_objects = True
+            if has_objects:
+                tiles.append((level_prefix, False))
+            next_level.extend(iterator.prefixes)
+        level = next_level
+    tiles.extend((level_prefix, True) for level_prefix in level)
+    return sorted(tiles)
+
+
+def in_tiles(blob_name: str, tiles: list[tuple[str, bool]]) -> bool:
+    """Return True if blob_name is covered by one of the (prefix, recursive) tiles."""
+    return any(
+        blob_name.startswith(tile_prefix)
+        and (recursive or "/" not in blob_name[len(tile_prefix) :])
+        for tile_prefix, recursive in tiles
+    )
 
 
 def search_replies_in_gcs(
@@ -123,6 +407,13 @@ def search_replies_in_gcs(
     post_id: str,
     prefix: str = "raw/",
     max_files: int | None = None,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    include_full_reply: bool = False,
+    name_match_only: bool = False,
+    cache_db: str | None = None,
+    index_path: str | None = None,
+    prefix_depth: int = 0,
+    shard: tuple[int, int] | None = None,
 ) -> dict[str, Any]:
     """
     Search for replies to a specific post_id across all JSON files in GCS.
@@ -132,6 +423,18 @@ def search_replies_in_gcs(
         post_id: Post ID to search for
         prefix: Prefix to search in (default: "raw/")
         max_files: Maximum number of files to search (None for all)
+        concurrency: Number of files downloaded and searched in parallel
+        include_full_reply: If True, each match also carries the complete reply object
+        name_match_only: If True, only search the files named {post_id}.json (Instagram
+            layout) and skip the rest of the bucket
+        cache_db: Path of the local reply cache (see open_reply_cache), None to disable it
+        index_path: Object path of the reply index built by build_reply_index.py; when
+            given, only the files it lists (plus the name matches) are searched
+        prefix_depth: If > 0, split prefix into sub-prefixes that many levels down
+            (e.g. 2: raw/{country}/{platform}/) and scan them one after the other, so the
+            concurrent downloads of a tile all hit the same prefix
+        shard: Optional (index, count): only scan the tiles with position % count == index,
+            to split one search across several machines (requires prefix_depth)
 
     Returns:
         Dictionary with search results
@@ -142,48 +445,138 @@ def search_replies_in_gcs(
     all_matches: list[dict[str, Any]] = []
     files_searched = 0
     files_with_matches = 0
+    files_skipped_from_cache = 0
     errors = []
 
-    # List all JSON files in the bucket
-    blobs = bucket.list_blobs(prefix=prefix)
-    json_blobs = [blob for blob in blobs if blob.name.endswith(".json")]
+    # Files named after the post (Instagram: raw/{country}/{platform}/{candidate_id}/{post_id}.json)
+    # are listed first with a server-side glob, so known hits are searched before anything else
+    post_file_suffix = f"/{post_id}.json"
+    name_matches = [
+        blob
+        for blob in bucket.list_blobs(prefix=prefix, match_glob=f"{prefix}**{post_file_suffix}")
+        if blob.name.endswith(post_file_suffix)
+    ]
+    print(f"Found {len(name_matches)} file(s) named after post_id={post_id}", file=sys.stderr)
+
+    if name_match_only:
+        json_blobs = iter(name_matches)
+    elif index_path:
+        # Only the files the reverse index lists for this post_id (O(matches), no listing)
+        from build_reply_index import lookup_reply_index
+
+        name_match_names = {blob.name for blob in name_matches}
+        indexed_names = lookup_reply_index(bucket_name, index_path, post_id)
+        print(f"Reply index lists {len(indexed_names)} file(s)", file=sys.stderr)
+        json_blobs = chain(
+            name_matches,
+            (bucket.blob(name) for name in indexed_names if name not in name_match_names),
+        )
+        # Blobs built from names carry no generation to validate cache entries against
+        cache_db = None
+    else:
+        if prefix_depth > 0:
+            tiles = list_prefix_tiles(bucket, prefix, prefix_depth)
+            if shard:
+                shard_index, shard_count = shard
+                tiles = tiles[shard_index::shard_count]
+                name_matches = [blob for blob in name_matches if in_tiles(blob.name, tiles)]
+            print(f"Scanning {len(tiles)} prefix tile(s)", file=sys.stderr)
+            blobs = chain.from_iterable(
+                bucket.list_blobs(prefix=tile_prefix)
+                if recursive
+                else bucket.list_blobs(prefix=tile_prefix, delimiter="/")
+                for tile_prefix, recursive in tiles
+            )
+        else:
+            blobs = bucket.list_blobs(prefix=prefix)
+
+        # Then stream the remaining JSON files (pages are fetched as the search advances)
+        name_match_names = {blob.name for blob in name_matches}
+        json_blobs = chain(
+            name_matches,
+            (
+                blob
+                for blob in blobs
+                if blob.name.endswith(".json") and blob.name not in name_match_names
+            ),
+        )
 
     if max_files:
-        json_blobs = json_blobs[:max_files]
+        json_blobs = islice(json_blobs, max_files)
 
     print(f"Searching for replies to post_id={post_id}...", file=sys.stderr)
-    print(f"Found {len(json_blobs)} JSON files to search", file=sys.stderr)
 
-    for blob in json_blobs:
-        try:
+    cache = open_reply_cache(cache_db) if cache_db else None
+    pending_cache_writes = 0
+
+    # Progress is reported in batches (mininterval) instead of one stderr line per hit
+    progress = None
+    log = print
+    if tqdm is not None:
+        progress = tqdm(desc="scanning", unit="file", mininterval=0.5, file=sys.stderr)
+        log = tqdm.write
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        # Results (and cache reads/writes) are handled in this thread, so the counters and
+        # the sqlite connection need no locking
+        for blob, future, cached in iter_search_results(
+            executor,
+            json_blobs,
+            post_id,
+            max_in_flight=2 * concurrency,
+            include_full_reply=include_full_reply,
+            cache=cache,
+        ):
             files_searched += 1
-            if files_searched % 100 == 0:
-                print(f"  Searched {files_searched}/{len(json_blobs)} files...", file=sys.stderr)
-
-            # Download and parse JSON
-            content = blob.download_as_text()
-            data = json.loads(content)
+            if progress is not None:
+                progress.update()
+            elif files_searched % PROGRESS_EVERY == 0:
+                print(
+                    f"  Searched {files_searched} files, {len(all_matches)} reply(ies) found...",
+                    file=sys.stderr,
+                )
 
-            # Search for replies
-            matches = search_replies_in_json(data, post_id, blob.name)
+            if future is None:
+                files_skipped_from_cache += 1
+                continue
+
+            try:
+                matches, parent_ids = future.result()
+            except JSON_ERRORS as e:
+                error_msg = f"Error parsing JSON in {blob.name}: {str(e)}"
+                errors.append(error_msg)
+                log(f"  ✗ {error_msg}", file=sys.stderr)
+                continue
+            except Exception as e:
+                error_msg = f"Error processing {blob.name}: {str(e)}"
+                errors.append(error_msg)
+                log(f"  ✗ {error_msg}", file=sys.stderr)
+                continue
+
+            if cache is not None and not cached:
+                cache_parent_ids(cache, blob, parent_ids)
+                pending_cache_writes += 1
+                if pending_cache_writes >= CACHE_COMMIT_EVERY:
+                    cache.commit()
+                    pending_cache_writes = 0
 
             if matches:
                 files_with_matches += 1
                 all_matches.extend(matches)
-                print(f"  ✓ Found {len(matches)} reply(ies) in {blob.name}", file=sys.stderr)
+                if progress is not None:
+                    progress.set_postfix(replies=len(all_matches), refresh=False)
 
-        except json.JSONDecodeError as e:
-            error_msg = f"Error parsing JSON in {blob.name}: {str(e)}"
-            errors.append(error_msg)
-            print(f"  ✗ {error_msg}", file=sys.stderr)
-        except Exception as e:
-            error_msg = f"Error processing {blob.name}: {str(e)}"
-            errors.append(error_msg)
-            print(f"  ✗ {error_msg}", file=sys.stderr)
+    if progress is not None:
+        progress.close()
+
+    if cache is not None:
+        cache.commit()
+        cache.close()
 
     return {
         "post_id": post_id,
         "total_files_searched": files_searched,
+        "files_skipped_from_cache": files_skipped_from_cache,
         "files_with_matches": files_with_matches,
         "total_matches": len(all_matches),
         "matches": all_matches,
@@ -191,6 +584,27 @@ def search_replies_in_gcs(
     }
 
 
+def dumps_json(obj: Any, compact: bool = False) -> bytes:
+    """Serialize obj as UTF-8 JSON (indented unless compact), using orjson when available."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS
+        if not compact:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, option=option, default=str)
+    return json.dumps(obj, ensure_ascii=False, indent=None if compact else 2, default=str).encode()
+
+
+def parse_shard(value: str) -> tuple[int, int]:
+    """Parse a --shard value 'i/N' into (i, N) with 0 <= i < N."""
+    try:
+        index, count = (int(part) for part in value.split("/"))
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected i/N, got {value!r}") from None
+    if count < 1 or not 0 <= index < count:
+        raise argparse.ArgumentTypeError(f"expected 0 <= i < N, got {value!r}")
+    return index, count
+
+
 def main() -> int:
     parser = argparse.ArgumentParser(
         description="Search for replies to a specific post_id in GCS JSON files",
@@ -233,6 +647,63 @@ Examples:
         default=None,
         help="Maximum number of files to search (default: all)",
     )
+    parser.add_argument(
+        "--prefix-depth",
+        type=int,
+        default=0,
+        help="Scan the prefix as sub-prefix tiles this many levels down, one tile at a time "
+        "(2 = raw/{country}/{platform}/; default: 0, one flat listing)",
+    )
+    parser.add_argument(
+        "--shard",
+        type=parse_shard,
+        default=None,
+        help="Only scan every N-th prefix tile starting at i, given as i/N (e.g. 0/4); "
+        "requires --prefix-depth",
+    )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help="Number of files downloaded and searched in parallel "
+        f"(default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--name-match-only",
+        action="store_true",
+        help="Only search files named {post_id}.json (Instagram layout); skips the scan of "
+        "every other file, so Twitter-style replies stored elsewhere are not found",
+    )
+    parser.add_argument(
+        "--include-full-reply",
+        action="store_true",
+        help="Include the complete reply object in each match (JSON output gets much larger)",
+    )
+    parser.add_argument(
+        "--use-index",
+        action="store_true",
+        help="Look up the files to search in the reverse reply index built by "
+        "build_reply_index.py instead of scanning the bucket (files added after the last "
+        "index build are not searched)",
+    )
+    parser.add_argument(
+        "--index-path",
+        type=str,
+        default="indexes/replies_by_parent.parquet",
+        help="Object path of the reply index (default: indexes/replies_by_parent.parquet)",
+    )
+    parser.add_argument(
+        "--cache-db",
+        type=str,
+        default=DEFAULT_CACHE_DB,
+        help="Local SQLite cache of the post ids each file replies to; files known to hold "
+        f"no reply to post_id are not downloaded again (default: {DEFAULT_CACHE_DB})",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Do not read or update the local reply cache",
+    )
     parser.add_argument(
         "--output",
         type=str,
@@ -246,9 +717,17 @@ Examples:
         default="text",
         help="Output format (default: text)",
     )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="Write JSON output without indentation (faster, for pipelines)",
+    )
 
     args = parser.parse_args()
 
+    if args.shard and args.prefix_depth < 1:
+        parser.error("--shard requires --prefix-depth")
+
     # Get bucket name
     bucket_name = args.bucket or os.getenv("GCS_BUCKET_NAME")
     if not bucket_name:
@@ -265,11 +744,18 @@ Examples:
             post_id=args.post_id,
             prefix=args.prefix,
             max_files=args.max_files,
+            concurrency=args.concurrency,
+            include_full_reply=args.include_full_reply,
+            name_match_only=args.name_match_only,
+            cache_db=None if args.no_cache else args.cache_db,
+            index_path=args.index_path if args.use_index else None,
+            prefix_depth=args.prefix_depth,
+            shard=args.shard,
         )
 
         # Format output
         if args.format == "json" or args.output:
-            output = json.dumps(results, ensure_ascii=False, indent=2, default=str)
+            output = dumps_json(results, compact=args.compact)
         else:
             # Text format
             output_lines = []
@@ -278,6 +764,9 @@ Examples:
             output_lines.append("=" * 80)
             output_lines.append("")
             output_lines.append(f"Files searched: {results['total_files_searched']}")
+            output_lines.append(
+                f"Files skipped (cached, no replies): {results['files_skipped_from_cache']}"
+            )
             output_lines.append(f"Files with matches: {results['files_with_matches']}")
             output_lines.append(f"Total replies found: {results['total_matches']}")
             output_lines.append("")
@@ -318,9 +807,16 @@ Examples:
 
         # Write output
         if args.output:
-            with open(args.output, "w", encoding="utf-8") as f:
-                f.write(output)
+            if isinstance(output, bytes):
+                with open(args.output, "wb") as f:
+                    f.write(output)
+            else:
+                with open(args.output, "w", encoding="utf-8") as f:
+                    f.write(output)
             print(f"Results saved to {args.output}", file=sys.stderr)
+        elif isinstance(output, bytes):
+            sys.stdout.flush()
+            sys.stdout.buffer.write(output + b"\n")
         else:
             print(output)
 
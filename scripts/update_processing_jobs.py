@@ -21,12 +21,25 @@ Usage:
       --csv data/bq-reprocess-honduras.csv \
       --new-status finished \
       --dry-run
+
+    # Keep every processed post_id in a JSONL file (large CSVs)
+    poetry run python scripts/update_processing_jobs.py \
+      --csv data/bq-reprocess-honduras.csv \
+      --new-status finished \
+      --output-log processed.jsonl
 """
 
 import argparse
 import csv
+import json
 import os
 import sys
+from collections.abc import Iterable, Iterator
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
 from typing import Any
 
@@ -42,26 +55,73 @@ sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "src"))
 
 try:
     from google.cloud import firestore
+    from google.cloud.firestore_v1.bulk_writer import BulkWriter
+
+    from trust_api.scrapping_tools.services import create_bulk_writer
 except ImportError as e:
-    print(f"Error importing google-cloud-firestore: {e}", file=sys.stderr)
-    print("Install it with: poetry add google-cloud-firestore")
+    print(f"Error importing modules: {e}", file=sys.stderr)
+    print("Make sure dependencies are installed (poetry install)", file=sys.stderr)
     sys.exit(1)
 
+# tqdm is optional: a progress bar when installed, a summary line per CSV chunk otherwise
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
 load_dotenv()
 
+# CSV rows read, looked up and updated at a time (bounds memory on large CSVs)
+CSV_CHUNK_SIZE = 10_000
+
+# posts_processed entries kept in the results (the full list goes to --output-log)
+PROCESSED_SAMPLE_SIZE = 10
+
+# post_id lookups are network-bound, so they are run concurrently
+DEFAULT_CONCURRENCY = 32
+
+# Maximum number of values in a Firestore 'in' filter
+IN_QUERY_MAX_VALUES = 30
 
+
+@lru_cache(maxsize=8)
 def get_firestore_client_custom(
     project_id: str | None = None, database: str = "socialnetworks"
 ) -> firestore.Client:
-    """Initialize and return Firestore client with custom project/database."""
+    """Initialize and return Firestore client with custom project/database (cached)."""
     if project_id:
         return firestore.Client(project=project_id, database=database)
     return firestore.Client(database=database)
 
 
+def iter_columns(
+    reader: Iterable[list[str]], header: list[str], columns: tuple[str, ...]
+) -> Iterator[tuple[str, ...]]:
+    """
+    Yield the values of columns for each non-empty CSV row ('' for missing columns/values,
+    fields beyond the header are ignored).
+
+    Column positions are resolved once from the header, so rows are plain lists from
+    csv.reader instead of one dict per row (csv.DictReader).
+    """
+    width = len(header) + 1
+    # Columns absent from the header read the trailing '' padding
+    positions = {name: i for i, name in enumerate(header)}
+    getter = itemgetter(*(positions.get(name, width - 1) for name in columns))
+    padding = [""] * width
+    for row in reader:
+        if not row:
+            continue  # Blank line (skipped by csv.DictReader too)
+        if len(row) >= width:
+            # Extra fields are dropped (csv.DictReader puts them under restkey), so the
+            # slot read for missing columns is always the '' padding
+            del row[width - 1 :]
+        row += padding[len(row) :]
+        yield getter(row)
+
+
 def find_processing_posts(
-    client: firestore.Client,
-    posts_collection: str,
+    posts_ref: firestore.CollectionReference,
     post_id: str,
     platform: str | None = None,
 ) -> list[tuple[str, dict[str, Any]]]:
@@ -71,11 +131,7 @@ def find_processing_posts(
     Returns:
         List of tuples (doc_id, post_data)
     """
-    query = (
-        client.collection(posts_collection)
-        .where("post_id", "==", post_id)
-        .where("status", "==", "processing")
-    )
+    query = posts_ref.where("post_id", "==", post_id).where("status", "==", "processing")
 
     if platform:
         query = query.where("platform", "==", platform.lower())
@@ -87,29 +143,64 @@ def find_processing_posts(
     return posts
 
 
+def find_processing_posts_batch(
+    posts_ref: firestore.CollectionReference,
+    post_ids: list[str],
+    platform: str | None = None,
+) -> dict[str, list[tuple[str, dict[str, Any]]]]:
+    """
+    Find posts with status='processing' for up to IN_QUERY_MAX_VALUES post_ids in one query.
+
+    Falls back to one query per post_id (find_processing_posts) if the 'in' query is
+    rejected, e.g. for lack of an index.
+
+    Returns:
+        Dictionary post_id -> list of tuples (doc_id, post_data), for post_ids with posts
+    """
+    query = posts_ref.where("post_id", "in", post_ids).where("status", "==", "processing")
+
+    if platform:
+        query = query.where("platform", "==", platform.lower())
+
+    posts_by_id: dict[str, list[tuple[str, dict[str, Any]]]] = {}
+    try:
+        for doc in query.stream():
+            post_data = doc.to_dict()
+            posts_by_id.setdefault(post_data.get("post_id"), []).append((doc.id, post_data))
+    except Exception as e:
+        print(f"  WARNING: batched lookup failed ({e}), querying post_ids one by one")
+        posts_by_id = {}
+        for post_id in post_ids:
+            posts = find_processing_posts(posts_ref, post_id, platform)
+            if posts:
+                posts_by_id[post_id] = posts
+
+    return posts_by_id
+
+
 def update_post_status_custom(
-    client: firestore.Client,
-    posts_collection: str,
+    posts_ref: firestore.CollectionReference,
+    bulk_writer: BulkWriter | None,
     doc_id: str,
     new_status: str,
     dry_run: bool = False,
 ) -> bool:
     """
-    Update post status in Firestore.
+    Queue a post status update on the BulkWriter.
+
+    The write is sent in batches with the other queued updates; failures are reported
+    through the BulkWriter error callback once it is flushed (see create_bulk_writer).
 
     Returns:
-        True if updated, False otherwise
+        True if queued (or would be, in dry run), False otherwise
     """
     if dry_run:
-        print(f"  [DRY RUN] Would update post {doc_id} to '{new_status}'")
         return True
 
     try:
-        from datetime import datetime, timezone
-
-        doc_ref = client.collection(posts_collection).document(doc_id)
+        doc_ref = posts_ref.document(doc_id)
         now = datetime.now(timezone.utc)
-        doc_ref.update({"status": new_status, "updated_at": now})
+        bulk_writer.update(doc_ref, {"status": new_status, "updated_at": now})
         return True
     except Exception as e:
         print(f"  ERROR updating post {doc_id}: {e}")
@@ -123,14 +214,32 @@ def process_csv_and_update_posts(
     database: str = "socialnetworks",
     project_id: str | None = None,
     dry_run: bool = False,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    output_log: str | None = None,
+    verbose: bool = False,
 ) -> dict[str, Any]:
     """
     Process CSV and update processing posts to new_status.
 
+    The CSV is read in chunks of CSV_CHUNK_SIZE rows, each looked up, updated and flushed
+    before the next one is read, so memory stays bounded on million-row CSVs. Only counters
+    and the first PROCESSED_SAMPLE_SIZE posts_processed entries are kept in the results;
+    if output_log is set, every entry is written to it as one JSON line.
+
+    Progress is shown as a tqdm bar (or one line per chunk without tqdm); verbose prints
+    a line per post found and per update instead.
+
+    Processing posts are looked up with one 'post_id in [...]' query per chunk of
+    IN_QUERY_MAX_VALUES post_ids of the same platform; the chunks are queried concurrently
+    (one shared client, which is thread-safe) and results are handled in CSV order in this
+    thread.
+
     Returns:
         Dictionary with processing results
     """
     client = get_firestore_client_custom(project_id, database)
+    # Built once and shared by every lookup and update
+    posts_ref = client.collection(posts_collection)
 
     csv_file = Path(csv_path)
     if not csv_file.exists():
@@ -142,58 +251,147 @@ def process_csv_and_update_posts(
         "posts_found": 0,
         "posts_updated": 0,
         "errors": 0,
+        "duplicates_skipped": 0,
+        "posts_processed_count": 0,
         "posts_processed": [],
     }
 
-    with open(csv_file, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-
-        for row in reader:
-            results["total_in_csv"] += 1
-
-            post_id = row.get("post_id", "").strip()
-            platform = row.get("platform", "").strip() or None
-            country = row.get("country", "").strip()
-            candidate_id = row.get("candidate_id", "").strip()
+    failed_posts: dict[str, str] = {}
+    bulk_writer = None if dry_run else create_bulk_writer(client, failed_posts)
 
-            if not post_id:
-                continue
+    log_file = open(output_log, "w", encoding="utf-8") if output_log else None
 
-            # Find processing posts for this post_id
-            processing_posts = find_processing_posts(client, posts_collection, post_id, platform)
+    # (post_id, platform) pairs already handled: repeated CSV rows would query and update
+    # the same posts again
+    seen: set[tuple[str, str | None]] = set()
 
-            if processing_posts:
-                results["posts_with_processing_status"] += 1
-                results["posts_found"] += len(processing_posts)
+    progress = None
+    if tqdm is not None and not verbose:
+        progress = tqdm(desc="rows", unit="row", mininterval=0.5)
 
-                print(
-                    f"  [{results['posts_with_processing_status']}/{results['total_in_csv']}] "
-                    f"post_id={post_id}, platform={platform}, "
-                    f"found {len(processing_posts)} post(s) with status='processing'"
-                )
+    def lookup(
+        chunk: tuple[str | None, list[str]],
+    ) -> dict[str, list[tuple[str, dict[str, Any]]]]:
+        platform, post_ids = chunk
+        return find_processing_posts_batch(posts_ref, post_ids, platform)
 
-                # Update each post
-                for post_doc_id, post_data in processing_posts:
-                    current_status = post_data.get("status", "unknown")
-                    print(f"    Post {post_doc_id[:20]}... (status={current_status})")
-
-                    if update_post_status_custom(
-                        client, posts_collection, post_doc_id, new_status, dry_run
-                    ):
-                        results["posts_updated"] += 1
-                        print(f"      Updated to '{new_status}'")
-                    else:
-                        results["errors"] += 1
-
-                results["posts_processed"].append(
-                    {
+    try:
+        with (
+            open(csv_file, "r", encoding="utf-8") as f,
+            ThreadPoolExecutor(max_workers=concurrency) as executor,
+        ):
+            reader = csv.reader(f)
+            header = next(reader, [])
+            columns = iter_columns(
+                reader, header, ("post_id", "platform", "country", "candidate_id")
+            )
+
+            # Each chunk is looked up, updated and flushed before the next one is read
+            while chunk := list(islice(columns, CSV_CHUNK_SIZE)):
+                results["total_in_csv"] += len(chunk)
+                rows: list[tuple[str, str | None, str, str]] = []
+                for post_id, platform, country, candidate_id in chunk:
+                    post_id = post_id.strip()
+                    if not post_id:
+                        continue
+                    platform = platform.strip() or None
+                    if (post_id, platform) in seen:
+                        results["duplicates_skipped"] += 1
+                        continue
+                    seen.add((post_id, platform))
+                    rows.append((post_id, platform, country.strip(), candidate_id.strip()))
+
+                # Group post_ids by platform (the platform filter differs) in IN-sized chunks
+                post_ids_by_platform: dict[str | None, dict[str, None]] = {}
+                for post_id, platform, _country, _candidate_id in rows:
+                    post_ids_by_platform.setdefault(platform, {})[post_id] = None
+                query_chunks: list[tuple[str | None, list[str]]] = []
+                for platform, platform_post_ids in post_ids_by_platform.items():
+                    post_ids = list(platform_post_ids)
+                    for i in range(0, len(post_ids), IN_QUERY_MAX_VALUES):
+                        query_chunks.append((platform, post_ids[i : i + IN_QUERY_MAX_VALUES]))
+
+                # Find processing posts for every post_id of the chunk, one query per IN chunk
+                processing_posts_by_key: dict[
+                    tuple[str | None, str], list[tuple[str, dict[str, Any]]]
+                ] = {}
+                for (platform, _post_ids), posts_by_id in zip(
+                    query_chunks, executor.map(lookup, query_chunks)
+                ):
+                    for post_id, posts in posts_by_id.items():
+                        processing_posts_by_key[(platform, post_id)] = posts
+
+                for post_id, platform, country, candidate_id in rows:
+                    processing_posts = processing_posts_by_key.get((platform, post_id), [])
+                    if not processing_posts:
+                        continue
+
+                    results["posts_with_processing_status"] += 1
+                    results["posts_found"] += len(processing_posts)
+
+                    if verbose:
+                        print(
+                            f"  [{results['posts_with_processing_status']}/"
+                            f"{results['total_in_csv']}] post_id={post_id}, platform={platform}, "
+                            f"found {len(processing_posts)} post(s) with status='processing'"
+                        )
+
+                    # Update each post
+                    for post_doc_id, post_data in processing_posts:
+                        if update_post_status_custom(
+                            posts_ref, bulk_writer, post_doc_id, new_status, dry_run
+                        ):
+                            results["posts_updated"] += 1
+                            if verbose:
+                                current_status = post_data.get("status", "unknown")
+                                action = "[DRY RUN] Would update" if dry_run else "Queued update"
+                                print(
+                                    f"    Post {post_doc_id[:20]}... (status={current_status}): "
+                                    f"{action} to '{new_status}'"
+                                )
+                        else:
+                            results["errors"] += 1
+
+                    post_info = {
                         "post_id": post_id,
                         "platform": platform,
                         "country": country,
                         "candidate_id": candidate_id,
                         "posts_count": len(processing_posts),
                     }
-                )
+                    results["posts_processed_count"] += 1
+                    if len(results["posts_processed"]) < PROCESSED_SAMPLE_SIZE:
+                        results["posts_processed"].append(post_info)
+                    if log_file is not None:
+                        log_file.write(json.dumps(post_info) + "\n")
+
+                if bulk_writer is not None:
+                    # Sends the chunk's queued updates before the next chunk is read
+                    bulk_writer.flush()
+                if progress is not None:
+                    progress.update(len(chunk))
+                    progress.set_postfix(
+                        found=results["posts_found"], updated=results["posts_updated"]
+                    )
+                else:
+                    print(
+                        f"Read {results['total_in_csv']} rows: "
+                        f"{results['posts_with_processing_status']} with status='processing', "
+                        f"{results['posts_updated']} update(s) queued"
+                    )
+    finally:
+        if progress is not None:
+            progress.close()
+        if log_file is not None:
+            log_file.close()
+
+    if bulk_writer is not None:
+        # Waits for every write (and retry) still in flight
+        bulk_writer.close()
+        for doc_id, message in failed_posts.items():
+            print(f"  ERROR updating post {doc_id}: {message}")
+        results["posts_updated"] -= len(failed_posts)
+        results["errors"] += len(failed_posts)
 
     return results
 
@@ -237,6 +435,23 @@ def main():
         action="store_true",
         help="Show what would be updated without making changes",
     )
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        help=f"Number of post_id lookup queries run in parallel (default: {DEFAULT_CONCURRENCY})",
+    )
+    parser.add_argument(
+        "--output-log",
+        type=str,
+        default=None,
+        help="JSONL file to write every processed post_id to (default: only show the first 10)",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print a line per post found and per update instead of a progress bar",
+    )
 
     args = parser.parse_args()
 
@@ -260,6 +475,9 @@ def main():
             database=args.database,
             project_id=project_id,
             dry_run=args.dry_run,
+            concurrency=args.concurrency,
+            output_log=args.output_log,
+            verbose=args.verbose,
         )
 
         # Print summary
@@ -267,21 +485,25 @@ def main():
         print("Summary:")
         print("=" * 60)
         print(f"Total posts in CSV: {results['total_in_csv']}")
+        print(f"Duplicate rows skipped: {results['duplicates_skipped']}")
         print(f"Posts with status='processing': {results['posts_with_processing_status']}")
         print(f"Total processing posts found: {results['posts_found']}")
         print(f"Posts updated: {results['posts_updated']}")
         print(f"Errors: {results['errors']}")
 
         if results["posts_processed"]:
-            print(f"\nPosts processed ({len(results['posts_processed'])}):")
-            for post_info in results["posts_processed"][:10]:  # Show first 10
+            print(f"\nPosts processed ({results['posts_processed_count']}):")
+            for post_info in results["posts_processed"]:  # First PROCESSED_SAMPLE_SIZE
                 print(
                     f"  - post_id={post_info['post_id']}, "
                     f"platform={post_info['platform']}, "
                     f"posts={post_info['posts_count']}"
                 )
-            if len(results["posts_processed"]) > 10:
-                print(f"  ... and {len(results['posts_processed']) - 10} more")
+            remaining = results["posts_processed_count"] - len(results["posts_processed"])
+            if remaining > 0:
+                print(f"  ... and {remaining} more")
+        if args.output_log:
+            print(f"Processed posts written to {args.output_log}")
 
         if args.dry_run:
             print("\n[DRY RUN] No changes were made. Run without --dry-run to apply changes.")
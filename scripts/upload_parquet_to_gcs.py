@@ -21,7 +21,7 @@ Usage:
 import argparse
 import os
 import sys
-from pathlib import Path
+from concurrent.futures import ThreadPoolExecutor, as_completed
 
 from dotenv import load_dotenv
 
@@ -29,58 +29,87 @@ load_dotenv()
 
 try:
     from google.cloud import storage
+    from google.cloud.storage import transfer_manager
 except ImportError:
     print("ERROR: google-cloud-storage is required. Install with: poetry add google-cloud-storage")
     sys.exit(1)
 
+MB = 1024 * 1024
 
-def upload_file_to_gcs(
-    local_path: str,
-    bucket_name: str,
-    blob_path: str,
-) -> str:
-    """Upload a file to GCS and return URI."""
-    client = storage.Client()
-    bucket = client.bucket(bucket_name)
-    blob = bucket.blob(blob_path)
+# Uploads are network-bound, so several files are uploaded at once
+DEFAULT_WORKERS = 8
 
-    blob.upload_from_filename(local_path)
+# Files above this size are uploaded as concurrent chunks (XML multipart upload), so one
+# large file is not limited to a single connection
+CHUNKED_UPLOAD_THRESHOLD = 64 * MB
+CHUNKED_UPLOAD_CHUNK_SIZE = 32 * MB
+CHUNKED_UPLOAD_WORKERS = 8
 
-    return f"gs://{bucket_name}/{blob_path}"
+# Resumable upload chunk size for the other files (must be a multiple of 256 KiB)
+RESUMABLE_CHUNK_SIZE = 8 * MB
 
 
-def find_parquet_files(source_dir: str) -> list[tuple[str, str]]:
+def upload_file_to_gcs(
+    local_path: str,
+    bucket: storage.Bucket,
+    blob_path: str,
+    size_bytes: int,
+) -> str:
+    """Upload a file to GCS and return URI (the bucket, and its client, is shared by uploads)."""
+    if size_bytes > CHUNKED_UPLOAD_THRESHOLD:
+        # Threads, not processes: this already runs inside the upload thread pool
+        transfer_manager.upload_chunks_concurrently(
+            local_path,
+            bucket.blob(blob_path),
+            chunk_size=CHUNKED_UPLOAD_CHUNK_SIZE,
+            worker_type=transfer_manager.THREAD,
+            max_workers=CHUNKED_UPLOAD_WORKERS,
+        )
+    else:
+        blob = bucket.blob(blob_path, chunk_size=RESUMABLE_CHUNK_SIZE)
+        blob.upload_from_filename(local_path)
+
+    return f"gs://{bucket.name}/{blob_path}"
+
+
+def find_parquet_files(source_dir: str) -> list[tuple[str, str, int]]:
     """
-    Find all .parquet files in source_dir and return (local_path, gcs_path).
+    Find all .parquet files in source_dir and return (local_path, gcs_path, size_bytes).
 
     Expected structure:
     source_dir/replies/ingestion_date={date}/platform={platform}/data.parquet
 
     Returns:
-        List of (local_path, gcs_path) tuples
+        List of (local_path, gcs_path, size_bytes) tuples
     """
-    source_path = Path(source_dir)
-    if not source_path.exists():
+    if not os.path.isdir(source_dir):
         return []
 
     parquet_files = []
 
-    # Walk through the directory structure
-    for parquet_file in source_path.rglob("*.parquet"):
-        # Get relative path from source_dir
-        relative_path = parquet_file.relative_to(source_path)
-
-        # Convert to GCS path
-        # Expected structure: replies/ingestion_date=*/platform=*/data.parquet
-        parts = relative_path.parts
-        if parts[0] == "replies":
-            # Already has replies/ prefix
-            gcs_path = f"processed/{relative_path}"
-        else:
-            # Add processed/replies/ prefix
-            gcs_path = f"processed/replies/{relative_path}"
-
-        parquet_files.append((str(parquet_file), gcs_path))
+    # Iterative walk with os.scandir: DirEntry caches the file type from the directory
+    # listing, so no stat() or Path object is needed per entry. Relative paths are built
+    # along the way (with "/", as in GCS).
+    stack = [(source_dir, "")]
+    while stack:
+        directory, relative_dir = stack.pop()
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                relative_path = f"{relative_dir}{entry.name}"
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append((entry.path, f"{relative_path}/"))
+                elif entry.name.endswith(".parquet") and entry.is_file(follow_symlinks=False):
+                    # Convert to GCS path
+                    # Expected structure: replies/ingestion_date=*/platform=*/data.parquet
+                    if relative_path.startswith("replies/"):
+                        # Already has replies/ prefix
+                        gcs_path = f"processed/{relative_path}"
+                    else:
+                        # Add processed/replies/ prefix
+                        gcs_path = f"processed/replies/{relative_path}"
+
+                    size_bytes = entry.stat(follow_symlinks=False).st_size
+                    parquet_files.append((entry.path, gcs_path, size_bytes))
 
     return parquet_files
 
@@ -102,6 +131,12 @@ def main():
         action="store_true",
         help="Show what would be uploaded without actually uploading",
     )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=f"Number of files uploaded in parallel (default: {DEFAULT_WORKERS})",
+    )
 
     args = parser.parse_args()
 
@@ -125,10 +160,10 @@ def main():
 
     # Show what will be uploaded
     print("Files to upload:")
-    for local_path, gcs_path in sorted(parquet_files):
-        size_mb = os.path.getsize(local_path) / (1024 * 1024)
+    parquet_files.sort()
+    for local_path, gcs_path, size_bytes in parquet_files:
         print(f"  {local_path}")
-        print(f"    → gs://{args.bucket}/{gcs_path} ({size_mb:.2f} MB)")
+        print(f"    → gs://{args.bucket}/{gcs_path} ({size_bytes / MB:.2f} MB)")
 
     if args.dry_run:
         print("\n[DRY RUN] No files uploaded")
@@ -137,19 +172,30 @@ def main():
     # Upload files
     print("\nUploading files...")
     uploaded_count = 0
-    total_size_mb = 0
-
-    for local_path, gcs_path in sorted(parquet_files):
-        try:
-            uri = upload_file_to_gcs(local_path, args.bucket, gcs_path)
-            size_mb = os.path.getsize(local_path) / (1024 * 1024)
-            total_size_mb += size_mb
+    total_size_bytes = 0
+
+    # One client (auth + HTTP connection pool) and bucket shared by every upload
+    bucket = storage.Client().bucket(args.bucket)
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        futures = {}
+        for local_path, gcs_path, size_bytes in parquet_files:
+            future = executor.submit(upload_file_to_gcs, local_path, bucket, gcs_path, size_bytes)
+            futures[future] = (local_path, size_bytes)
+        for future in as_completed(futures):
+            local_path, size_bytes = futures[future]
+            try:
+                uri = future.result()
+            except Exception as e:
+                print(f"  ❌ Error uploading {local_path}: {e}")
+                # Don't start the uploads still queued; running ones finish before exit
+                for pending in futures:
+                    pending.cancel()
+                sys.exit(1)
+            total_size_bytes += size_bytes
             uploaded_count += 1
-            print(f"  ✓ Uploaded: {uri} ({size_mb:.2f} MB)")
-        except Exception as e:
-            print(f"  ❌ Error uploading {local_path}: {e}")
-            sys.exit(1)
+            print(f"  ✓ Uploaded: {uri} ({size_bytes / MB:.2f} MB)")
 
+    total_size_mb = total_size_bytes / MB
     print(f"\n✓ Successfully uploaded {uploaded_count} file(s) ({total_size_mb:.2f} MB total)")
     print(f"\nFiles are now available at: gs://{args.bucket}/processed/replies/")
 
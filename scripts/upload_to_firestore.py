@@ -10,14 +10,15 @@ Uploads records with indexed fields:
 - status (default: "noreplies"; "skipped" when max_posts_replies=0 or replies_count=0)
 
 The CSV field 'created_at' is renamed to 'post_created_at' in Firestore (original post creation date).
-A new 'created_at' field is created with the current timestamp (when the record is inserted).
+A new 'created_at' field is set to the server timestamp of the commit (when the record is inserted).
 
 Required CSV columns: platform, post_id, country, candidate_id, max_posts_replies.
-All rows are validated before any upload; missing required column or empty value aborts with error.
+All rows are validated before any upload; missing required column or empty value aborts with error
+(as does a max_posts_replies that is not an integer).
 
 Non-indexed fields:
-- replies_count
-- max_posts_replies
+- replies_count (integer; left out if the CSV value is not one)
+- max_posts_replies (integer)
 - start_date, end_date (optional; written if present in CSV)
 
 The script reads GCP_PROJECT_ID from .env file (or command line argument).
@@ -40,13 +41,21 @@ Examples:
 """
 
 import csv
+import hashlib
 import os
 import sys
-from datetime import datetime, timezone
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
+from datetime import datetime
+from functools import lru_cache
+from itertools import islice
+from operator import itemgetter
 from pathlib import Path
+from typing import Any
 
 try:
     from dotenv import load_dotenv
+    from google.api_core import exceptions as api_exceptions
+    from google.api_core import retry as api_retry
     from google.cloud import firestore
 except ImportError as e:
     missing = "dotenv" if "dotenv" in str(e) else "google-cloud-firestore"
@@ -58,9 +67,268 @@ except ImportError as e:
         print("Install it with: poetry add google-cloud-firestore")
     sys.exit(1)
 
+# pyarrow is optional here: its C++ CSV reader is used when installed, csv.reader otherwise
+try:
+    import pyarrow as pa
+    from pyarrow import csv as pacsv
+except ImportError:
+    pa = None
+    pacsv = None
+
+# tqdm is optional: a progress bar when installed, a line every PROGRESS_EVERY records otherwise
+try:
+    from tqdm import tqdm
+except ImportError:
+    tqdm = None
+
+PROGRESS_EVERY = 500
+
 # Load environment variables from .env file
 load_dotenv()
 
+# Maximum number of writes Firestore accepts in a single batch commit
+FIRESTORE_BATCH_SIZE = 500
+
+# Batch commits failing with a transient error are retried with exponential backoff (with
+# jitter, applied by google.api_core) for up to COMMIT_RETRY_TIMEOUT seconds; the document
+# IDs are fixed before the first attempt, so a retried commit does not duplicate documents
+COMMIT_RETRY_TIMEOUT = 60.0
+COMMIT_RETRY = api_retry.Retry(
+    predicate=api_retry.if_exception_type(
+        api_exceptions.Aborted,
+        api_exceptions.DeadlineExceeded,
+        api_exceptions.InternalServerError,
+        api_exceptions.ResourceExhausted,
+        api_exceptions.ServiceUnavailable,
+    ),
+    initial=0.1,
+    maximum=10.0,
+    multiplier=2.0,
+    timeout=COMMIT_RETRY_TIMEOUT,
+)
+
+# Read buffer of the csv.reader fallback (the default is 8 KiB)
+CSV_READ_BUFFER_SIZE = 16 * 1024 * 1024
+
+# Maximum number of values in a Firestore 'in' filter
+IN_QUERY_MAX_VALUES = 30
+
+# Batch commits run concurrently (batches write disjoint new documents)
+DEFAULT_MAX_WORKERS = 10
+
+
+# CSV columns read by upload_to_firestore, in the order rows are unpacked
+CSV_COLUMNS = (
+    "platform",
+    "post_id",
+    "replies_count",
+    "country",
+    "candidate_id",
+    "max_posts_replies",
+    "created_at",
+    "start_date",
+    "end_date",
+)
+
+
+def read_csv_rows(
+    f, columns: tuple[str, ...], skip: int = 0, limit: int | None = None
+) -> tuple[list[str], list[tuple[str, ...]]]:
+    """
+    Read a CSV file and return (header, rows), each row holding only the given columns.
+
+    Column positions are looked up once from the header and each csv.reader row is reduced
+    with one itemgetter call, instead of building a dict per row. Missing columns or
+    values read as '', fields beyond the header are ignored and blank lines are skipped
+    (as csv.DictReader does).
+
+    Only rows skip to skip + limit are returned: the first skip rows are tokenized but
+    not converted, and reading stops after limit rows.
+    """
+    reader = csv.reader(f)
+    header = next(reader, [])
+    width = len(header) + 1
+    positions = {name: i for i, name in enumerate(header)}
+    getter = itemgetter(*(positions.get(name, width - 1) for name in columns))
+    padding = [""] * width
+    stop = skip + limit if limit is not None else None
+    rows = []
+    for row in islice((row for row in reader if row), skip, stop):
+        if len(row) >= width:
+            # Extra fields are dropped (csv.DictReader puts them under restkey), so the
+            # slot read for missing columns is always the '' padding
+            del row[width - 1 :]
+        row += padding[len(row) :]
+        rows.append(getter(row))
+    return header, rows
+
+
+def read_csv_rows_arrow(
+    csv_path: Path, columns: tuple[str, ...], skip: int = 0, limit: int | None = None
+) -> tuple[list[str], list[tuple[str, ...]]]:
+    """
+    Same as read_csv_rows, with the CSV tokenized by pyarrow's C++ reader.
+
+    Every column is read as a string (no type inference, which would turn post_ids into
+    numbers); the rows are then built column-wise with zip. Skipped rows are sliced off
+    (zero-copy) before conversion. Without a limit the whole file is read with the
+    multi-threaded reader; with one, it is streamed and reading stops after limit rows.
+
+    Raises:
+        pyarrow.ArrowInvalid: If the CSV is empty or a row has a different number of fields
+            than the header (csv.reader pads short rows instead)
+    """
+    with open(csv_path, "r", encoding="utf-8") as f:
+        header = next(csv.reader(f), [])
+    present = [name for name in columns if name in header]
+    parse_options = pacsv.ParseOptions(newlines_in_values=True)
+    convert_options = pacsv.ConvertOptions(
+        column_types={name: pa.string() for name in present},
+        include_columns=present,
+        strings_can_be_null=False,
+        quoted_strings_can_be_null=False,
+    )
+
+    if limit is None:
+        table = pacsv.read_csv(
+            csv_path, parse_options=parse_options, convert_options=convert_options
+        )
+        batches = [table.slice(skip)]
+    else:
+        batches = []
+        remaining_skip, remaining = skip, limit
+        reader = pacsv.open_csv(
+            csv_path, parse_options=parse_options, convert_options=convert_options
+        )
+        for batch in reader:
+            if remaining <= 0:
+                break
+            if remaining_skip >= batch.num_rows:
+                remaining_skip -= batch.num_rows
+                continue
+            batch = batch.slice(remaining_skip, remaining)
+            remaining_skip = 0
+            remaining -= batch.num_rows
+            batches.append(batch)
+
+    rows = []
+    for batch in batches:
+        missing = [""] * batch.num_rows
+        values = [
+            batch.column(name).to_pylist() if name in present else missing for name in columns
+        ]
+        rows.extend(zip(*values))
+    return header, rows
+
+
+def parse_int(value: str) -> int | None:
+    """
+    Return value as an int, or None if it is not an integer.
+
+    Plain digit strings (the common case) are checked with str.isdecimal() instead of
+    raising and catching ValueError; other values still go through int() (sign, spaces).
+    """
+    if value.isdecimal():
+        return int(value)
+    try:
+        return int(value)
+    except ValueError:
+        return None
+
+
+def parse_post_created_at(value: str, timestamp_format: str | None = None) -> datetime:
+    """
+    Parse the CSV created_at of a post into a datetime.
+
+    Values are parsed by datetime.fromisoformat alone: it is implemented in C and (since
+    Python 3.11) accepts "T" or " " separators, fractional seconds, "Z"/offsets and plain
+    dates, which were previously sent through Python-level strptime fallbacks. Values with
+    a "T" time but no offset are taken as UTC. With timestamp_format, datetime.strptime is
+    tried first (for non-ISO exports).
+
+    Raises:
+        ValueError: If the value matches none of the formats
+    """
+    value = value.strip()
+    if timestamp_format:
+        try:
+            return datetime.strptime(value, timestamp_format)
+        except ValueError:
+            pass
+    if "T" in value and value[-1] != "Z" and "+" not in value and "-" not in value[-6:]:
+        # Time without an offset: taken as UTC (cheaper than datetime.replace(tzinfo=...))
+        value += "+00:00"
+    return datetime.fromisoformat(value)
+
+
+@lru_cache(maxsize=8)
+def get_firestore_client(
+    project_id: str | None = None, database_name: str = "socialnetworks"
+) -> firestore.Client:
+    """
+    Return the Firestore client for a project/database, created once per process.
+
+    The client is thread-safe: every lookup and commit thread shares it (and its gRPC
+    channel) instead of opening its own connection.
+    """
+    if project_id:
+        return firestore.Client(project=project_id, database=database_name)
+    return firestore.Client(database=database_name)
+
+
+def post_doc_id(platform: str, post_id: str) -> str:
+    """
+    Return the document ID of a post: a hash of (platform, post_id).
+
+    The ID depends only on the post, so uploading the same row again (a re-run after a
+    failed or timed-out commit that did land) overwrites its document instead of
+    creating a duplicate. Hashed because post_id may contain characters ('/') that are
+    not allowed in document IDs.
+    """
+    return hashlib.blake2b(f"{platform}\0{post_id}".encode(), digest_size=16).hexdigest()
+
+
+def commit_records(
+    client: firestore.Client,
+    collection_ref: firestore.CollectionReference,
+    docs: list[tuple[str, dict[str, Any]]],
+) -> None:
+    """
+    Write (doc_id, doc_data) pairs as documents in a single batch commit.
+
+    Transient errors are retried (COMMIT_RETRY). The IDs are derived from the posts
+    (post_doc_id), so committing the same docs again overwrites them instead of creating
+    duplicates.
+    """
+    batch = client.batch()
+    for doc_id, doc_data in docs:
+        batch.set(collection_ref.document(doc_id), doc_data)
+    batch.commit(retry=COMMIT_RETRY)
+
+
+def find_existing_post_ids(
+    collection_ref: firestore.CollectionReference, post_ids: list[str], max_workers: int
+) -> set[str]:
+    """
+    Return the post_ids that already have a document in the collection.
+
+    Runs one 'post_id in [...]' query per IN_QUERY_MAX_VALUES post_ids (concurrently)
+    instead of one query per post_id, and only fetches the post_id field.
+    """
+
+    def lookup(chunk: list[str]) -> list[str]:
+        query = collection_ref.where("post_id", "in", chunk).select(["post_id"])
+        return [doc.get("post_id") for doc in query.stream()]
+
+    chunks = [
+        post_ids[i : i + IN_QUERY_MAX_VALUES] for i in range(0, len(post_ids), IN_QUERY_MAX_VALUES)
+    ]
+    existing: set[str] = set()
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        for found in executor.map(lookup, chunks):
+            existing.update(found)
+    return existing
+
 
 def upload_to_firestore(
     csv_path: str,
@@ -72,6 +340,10 @@ def upload_to_firestore(
     skip_existing: bool = False,
     max_posts_replies_limit: int | None = None,
     dry_run: bool = False,
+    batch_size: int = FIRESTORE_BATCH_SIZE,
+    max_workers: int = DEFAULT_MAX_WORKERS,
+    timestamp_format: str | None = None,
+    verbose: bool = False,
 ):
     """
     Upload records from CSV to Firestore.
@@ -86,12 +358,19 @@ def upload_to_firestore(
         skip_existing: If True, skip records where post_id already exists in Firestore (default: False)
         max_posts_replies_limit: Maximum value for max_posts_replies field (if None, no limit is applied)
         dry_run: If True, validate CSV and report what would be uploaded without writing to Firestore
+        batch_size: Records written per batch commit (at most FIRESTORE_BATCH_SIZE)
+        max_workers: Number of batch commits run concurrently
+        timestamp_format: strptime format of the CSV created_at column (if None, it is detected)
+        verbose: If True, print a line per record instead of a progress bar
+
+    Returns:
+        Tuple (records_uploaded, records_failed); records_failed counts the records of
+        batch commits that failed
     """
     # Initialize Firestore client (needed for validation and for skip_existing check)
-    if project_id:
-        client = firestore.Client(project=project_id, database=database_name)
-    else:
-        client = firestore.Client(database=database_name)
+    client = get_firestore_client(project_id, database_name)
+    # Built once and shared by every lookup and batch commit
+    collection_ref = client.collection(collection)
 
     # Read CSV file
     csv_file = Path(csv_path)
@@ -101,151 +380,229 @@ def upload_to_firestore(
 
     REQUIRED_COLUMNS = ("platform", "post_id", "country", "candidate_id", "max_posts_replies")
 
-    with open(csv_file, "r", encoding="utf-8") as f:
-        reader = csv.DictReader(f)
-        all_rows = list(reader)
-
-    if not all_rows:
+    # Only the rows to process (after skip, up to limit) are converted
+    rows_to_process = None
+    if pacsv is not None:
+        try:
+            header, rows_to_process = read_csv_rows_arrow(csv_file, CSV_COLUMNS, skip, limit)
+        except pa.ArrowInvalid:
+            pass  # Read with csv.reader below, which is more lenient
+    if rows_to_process is None:
+        # newline="" as the csv module expects; a large buffer means fewer read syscalls
+        with open(csv_file, "r", encoding="utf-8", newline="", buffering=CSV_READ_BUFFER_SIZE) as f:
+            header, rows_to_process = read_csv_rows(f, CSV_COLUMNS, skip, limit)
+
+    if not rows_to_process and skip == 0:
         print("Error: CSV has no data rows")
         sys.exit(1)
 
-    # Determine rows to process (after skip, up to limit)
-    end = (skip + limit) if limit is not None else None
-    rows_to_process = all_rows[skip:end]
-
     # Validate: no missing required values in any row before processing
-    for idx, row in enumerate(rows_to_process):
-        row_num = skip + idx + 2  # 1-based + header line
+    if rows_to_process:
         for col in REQUIRED_COLUMNS:
-            if col not in row:
-                print(f"Error: CSV row {row_num}: missing column '{col}'")
+            if col not in header:
+                print(f"Error: CSV row {skip + 2}: missing column '{col}'")
                 sys.exit(1)
-            val = (row.get(col) or "").strip()
-            if not val:
+    required_positions = [(CSV_COLUMNS.index(col), col) for col in REQUIRED_COLUMNS]
+    max_posts_replies_position = CSV_COLUMNS.index("max_posts_replies")
+    for idx, row in enumerate(rows_to_process):
+        row_num = skip + idx + 2  # 1-based + header line
+        for position, col in required_positions:
+            if not row[position].strip():
                 print(f"Error: CSV row {row_num}: missing value for required column '{col}'")
                 sys.exit(1)
+        if parse_int(row[max_posts_replies_position]) is None:
+            print(
+                f"Error: CSV row {row_num}: max_posts_replies must be an integer "
+                f"(got '{row[max_posts_replies_position]}')"
+            )
+            sys.exit(1)
+
+    # post_ids already in Firestore, looked up in bulk before the loop
+    existing_post_ids: set[str] = set()
+    if skip_existing:
+        post_id_position = CSV_COLUMNS.index("post_id")
+        post_ids = list(dict.fromkeys(row[post_id_position] for row in rows_to_process))
+        existing_post_ids = find_existing_post_ids(collection_ref, post_ids, max_workers)
 
     records_uploaded = 0
+    records_failed = 0
+    # (first, last) CSV positions of the batches whose commit failed
+    failed_ranges: list[tuple[int, int]] = []
     count_noreplies = 0
     count_skipped = 0
-
-    for idx, row in enumerate(rows_to_process):
-        # Extract fields from CSV
-        platform = row.get("platform", "")
-        post_id = row.get("post_id", "")
-        replies_count = row.get("replies_count", "")
-        country = row.get("country", "")
-        candidate_id = row.get("candidate_id", "")
-        max_posts_replies_raw = row.get("max_posts_replies", "")
-        post_created_at_str = row.get("created_at", "")
-        start_date = row.get("start_date", "")
-        end_date = row.get("end_date", "")
-        status = "noreplies"  # Default value
-        # If max_posts_replies=0 or replies_count=0, load job with status skipped
+    duplicates_skipped = 0
+    # (platform, post_id) pairs already seen: a repeated row would write the same document
+    # again, with the values of the later row
+    seen: set[tuple[str, str]] = set()
+    # Set by Firestore to the commit time of each batch: one sentinel shared by every record
+    # instead of a datetime per row, and no dependency on the local clock
+    created_at = firestore.SERVER_TIMESTAMP
+    # (CSV position, doc_data) of the records not yet submitted in a batch
+    pending_records: list[tuple[int, dict[str, Any]]] = []
+
+    show_progress = tqdm is not None and not verbose
+    rows_iter = rows_to_process
+    if show_progress:
+        rows_iter = tqdm(rows_to_process, desc="reading", unit="record", mininterval=0.5)
+
+    log = tqdm.write if show_progress else print
+
+    def handle_commit(future: Future, chunk: list[tuple[int, dict[str, Any]]]) -> None:
+        nonlocal records_uploaded, records_failed, count_noreplies, count_skipped
         try:
-            if int(max_posts_replies_raw.strip()) == 0:
-                status = "skipped"
-        except (ValueError, TypeError):
-            pass
-        if status != "skipped" and replies_count is not None and str(replies_count).strip():
-            try:
-                if int(str(replies_count).strip()) == 0:
-                    status = "skipped"
-            except (ValueError, TypeError):
-                pass
-        i = skip + idx
-
-        # Convert post_created_at (from CSV) string to Firestore timestamp
-        post_created_at = None
-        if post_created_at_str:
-            try:
-                # Try to parse ISO format: "2025-12-16T09:59:35.000000" or "2025-12-16T09:59:35"
-                created_at_str_clean = post_created_at_str.strip()
-                if "T" in created_at_str_clean:
-                    if created_at_str_clean.endswith("Z"):
-                        created_at_str_clean = created_at_str_clean[:-1] + "+00:00"
-                    elif "+" not in created_at_str_clean and "-" not in created_at_str_clean[-6:]:
-                        created_at_str_clean = created_at_str_clean + "+00:00"
-                    post_created_at = datetime.fromisoformat(created_at_str_clean)
-                else:
-                    for fmt in ["%Y-%m-%d %H:%M:%S", "%Y-%m-%d"]:
-                        try:
-                            post_created_at = datetime.strptime(created_at_str_clean, fmt)
-                            break
-                        except ValueError:
-                            continue
-            except (ValueError, TypeError) as e:
+            future.result()
+        except Exception as e:
+            records_failed += len(chunk)
+            failed_ranges.append((chunk[0][0] + 1, chunk[-1][0] + 1))
+            log(
+                f"Error uploading records {chunk[0][0] + 1}-{chunk[-1][0] + 1} "
+                f"({len(chunk)} records): {e}"
+            )
+            return
+
+        for i, doc_data in chunk:
+            records_uploaded += 1
+            if verbose:
                 print(
-                    f"Warning: Could not parse post_created_at '{post_created_at_str}' for "
-                    f"post_id={post_id}: {e}"
+                    f"Uploaded record {i + 1} (position {i + 1} in CSV): "
+                    f"platform={doc_data['platform']}, country={doc_data['country']}, "
+                    f"candidate_id={doc_data['candidate_id']}, post_id={doc_data['post_id']}"
                 )
-                post_created_at = post_created_at_str
-
-        created_at = datetime.now(timezone.utc)
-        doc_data = {
-            "platform": platform,
-            "post_id": post_id,
-            "country": country,
-            "candidate_id": candidate_id,
-            "created_at": created_at,
-            "status": status,
-        }
-        if post_created_at:
-            doc_data["post_created_at"] = post_created_at
-        if replies_count:
-            try:
-                doc_data["replies_count"] = int(replies_count)
-            except (ValueError, TypeError):
-                doc_data["replies_count"] = replies_count
-        try:
-            max_posts_replies_int = int(max_posts_replies_raw)
+            if doc_data["status"] == "skipped":
+                count_skipped += 1
+            else:
+                count_noreplies += 1
+        if (
+            not show_progress
+            and not verbose
+            and records_uploaded // PROGRESS_EVERY
+            > (records_uploaded - len(chunk)) // PROGRESS_EVERY
+        ):
+            print(f"  Uploaded {records_uploaded} records so far...")
+
+    # One commit per batch_size records instead of one write RPC per record. Each batch is
+    # submitted as soon as it fills, so commits run while the next rows are prepared; at most
+    # 2 * max_workers batches are in flight, so a slow Firestore holds back the CSV reading
+    # instead of letting queued batches pile up in memory.
+    futures: dict[Future, list[tuple[int, dict[str, Any]]]] = {}
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+
+        def submit_batch(chunk: list[tuple[int, dict[str, Any]]]) -> None:
+            if len(futures) >= 2 * max_workers:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                for future in done:
+                    handle_commit(future, futures.pop(future))
+            docs = [
+                (post_doc_id(doc_data["platform"], doc_data["post_id"]), doc_data)
+                for _, doc_data in chunk
+            ]
+            futures[executor.submit(commit_records, client, collection_ref, docs)] = chunk
+
+        for idx, row in enumerate(rows_iter):
+            # Extract fields from CSV (in CSV_COLUMNS order)
+            (
+                platform,
+                post_id,
+                replies_count,
+                country,
+                candidate_id,
+                max_posts_replies_raw,
+                post_created_at_str,
+                start_date,
+                end_date,
+            ) = row
+            if (platform, post_id) in seen:
+                duplicates_skipped += 1
+                continue
+            seen.add((platform, post_id))
+            # Parsed once, for the status and the stored values
+            replies_count_int = parse_int(replies_count)
+            max_posts_replies_int = parse_int(max_posts_replies_raw)
+            # If max_posts_replies=0 or replies_count=0, load job with status skipped
+            if max_posts_replies_int == 0 or replies_count_int == 0:
+                status = "skipped"
+            else:
+                status = "noreplies"  # Default value
+            i = skip + idx
+
+            # Stored as a native Firestore timestamp (chronological index, no parsing downstream)
+            post_created_at = None
+            if post_created_at_str:
+                try:
+                    post_created_at = parse_post_created_at(post_created_at_str, timestamp_format)
+                except ValueError as e:
+                    print(
+                        f"Warning: Could not parse post_created_at '{post_created_at_str}' for "
+                        f"post_id={post_id}: {e}"
+                    )
+                    post_created_at = post_created_at_str
+
+            doc_data = {
+                "platform": platform,
+                "post_id": post_id,
+                "country": country,
+                "candidate_id": candidate_id,
+                "created_at": created_at,
+                "status": status,
+            }
+            if post_created_at:
+                doc_data["post_created_at"] = post_created_at
+            # Numeric fields are always stored as integers (never the raw CSV string), so each
+            # has a single type in Firestore; a non-integer replies_count is left out
+            if replies_count_int is not None:
+                doc_data["replies_count"] = replies_count_int
             if (
                 max_posts_replies_limit is not None
                 and max_posts_replies_int > max_posts_replies_limit
             ):
                 max_posts_replies_int = max_posts_replies_limit
             doc_data["max_posts_replies"] = max_posts_replies_int
-        except (ValueError, TypeError):
-            doc_data["max_posts_replies"] = max_posts_replies_raw
-        if start_date:
-            doc_data["start_date"] = start_date.strip()
-        if end_date:
-            doc_data["end_date"] = end_date.strip()
-
-        if skip_existing and post_id:
-            existing_query = (
-                client.collection(collection).where("post_id", "==", post_id).limit(1).stream()
-            )
-            existing_docs = list(existing_query)
-            if existing_docs:
-                print(
-                    f"Skipped record {i + 1} (position {i + 1} in CSV): post_id={post_id} already exists"
-                )
+            if start_date:
+                doc_data["start_date"] = start_date.strip()
+            if end_date:
+                doc_data["end_date"] = end_date.strip()
+
+            if skip_existing and post_id in existing_post_ids:
+                if verbose:
+                    print(
+                        f"Skipped record {i + 1} (position {i + 1} in CSV): "
+                        f"post_id={post_id} already exists"
+                    )
                 continue
 
-        if dry_run:
-            print(
-                f"Would upload record {i + 1} (position {i + 1} in CSV): platform={platform}, "
-                f"country={country}, candidate_id={candidate_id}, post_id={post_id}"
-            )
-            records_uploaded += 1
-        else:
-            doc_ref = client.collection(collection).document()
-            doc_ref.set(doc_data)
-            records_uploaded += 1
-            print(
-                f"Uploaded record {i + 1} (position {i + 1} in CSV): platform={platform}, "
-                f"country={country}, candidate_id={candidate_id}, post_id={post_id}, created_at={created_at}"
-            )
-        if status == "skipped":
-            count_skipped += 1
-        else:
-            count_noreplies += 1
+            if dry_run:
+                if verbose:
+                    print(
+                        f"Would upload record {i + 1} (position {i + 1} in CSV): "
+                        f"platform={platform}, country={country}, "
+                        f"candidate_id={candidate_id}, post_id={post_id}"
+                    )
+                records_uploaded += 1
+                if status == "skipped":
+                    count_skipped += 1
+                else:
+                    count_noreplies += 1
+            else:
+                pending_records.append((i, doc_data))
+                if len(pending_records) >= batch_size:
+                    submit_batch(pending_records)
+                    pending_records = []
+
+        if pending_records:
+            submit_batch(pending_records)
+
+        for future in as_completed(futures):
+            handle_commit(future, futures[future])
 
     if dry_run:
         print(
             f"\nDry run: {records_uploaded} record(s) would be uploaded to Firestore database '{database_name}' (no writes performed)"
         )
+    elif records_failed:
+        print(
+            f"\nUploaded {records_uploaded} records to Firestore database '{database_name}', "
+            f"{records_failed} records FAILED"
+        )
     else:
         print(
             f"\nSuccessfully uploaded {records_uploaded} records to Firestore database '{database_name}'"
@@ -253,6 +610,16 @@ def upload_to_firestore(
     print("Summary:")
     print(f"  - noreplies: {count_noreplies}")
     print(f"  - skipped: {count_skipped}")
+    if records_failed:
+        print(f"  - failed: {records_failed}")
+        # Batches are filled in CSV order, so each failed batch is a contiguous range. A
+        # re-run is safe even if a commit landed despite the error: documents are keyed
+        # by (platform, post_id), so rows are overwritten, not duplicated
+        print("Failed CSV positions (re-run each range with --skip/--limit):")
+        for first, last in sorted(failed_ranges):
+            print(f"  - {first}-{last}: --skip {first - 1} --limit {last - first + 1}")
+    if duplicates_skipped:
+        print(f"  - duplicate rows skipped: {duplicates_skipped}")
     if skip > 0:
         print(f"Skipped first {skip} records from CSV")
     if skip_existing:
@@ -262,7 +629,7 @@ def upload_to_firestore(
             f"Warning: Only {records_uploaded} records were uploaded (requested {limit}). "
             f"CSV file may have fewer records than expected, or some were skipped due to duplicates."
         )
-    return records_uploaded
+    return records_uploaded, records_failed
 
 
 if __name__ == "__main__":
@@ -365,9 +732,36 @@ Examples:
         dest="dry_run",
         help="Validate CSV and print what would be uploaded without writing to Firestore",
     )
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=FIRESTORE_BATCH_SIZE,
+        help=f"Records written per batch commit (default and maximum: {FIRESTORE_BATCH_SIZE})",
+    )
+    parser.add_argument(
+        "--max-workers",
+        type=int,
+        default=DEFAULT_MAX_WORKERS,
+        help=f"Number of batch commits run concurrently (default: {DEFAULT_MAX_WORKERS})",
+    )
+    parser.add_argument(
+        "--timestamp-format",
+        type=str,
+        default=None,
+        help="strptime format of the CSV created_at column, e.g. '%%Y-%%m-%%d %%H:%%M:%%S' "
+        "(default: ISO 8601, e.g. '2025-12-16T09:59:35Z' or '2025-12-16 09:59:35')",
+    )
+    parser.add_argument(
+        "--verbose",
+        action="store_true",
+        help="Print a line per record instead of a progress bar",
+    )
 
     args = parser.parse_args()
 
+    if not 1 <= args.batch_size <= FIRESTORE_BATCH_SIZE:
+        parser.error(f"--batch-size must be between 1 and {FIRESTORE_BATCH_SIZE}")
+
     # Use --all flag to upload everything, otherwise use limit
     if args.all:
         limit = None
@@ -408,7 +802,7 @@ Examples:
         print("Dry run: no records will be written to Firestore")
     print()
 
-    upload_to_firestore(
+    _, records_failed = upload_to_firestore(
         args.csv_path,
         args.collection,
         args.database_name,
@@ -418,4 +812,10 @@ Examples:
         args.skip_existing,
         args.max_posts_replies_limit,
         dry_run=args.dry_run,
+        batch_size=args.batch_size,
+        max_workers=args.max_workers,
+        timestamp_format=args.timestamp_format,
+        verbose=args.verbose,
     )
+    if records_failed:
+        sys.exit(1)
@@ -6,9 +6,11 @@ import logging
 import re
 import time
 from datetime import datetime, timedelta, timezone
+from functools import lru_cache
 from typing import Any, Literal
 
 from google.cloud import firestore, storage
+from google.cloud.firestore_v1.bulk_writer import BulkWriter
 
 try:
     import pyarrow as pa
@@ -22,8 +24,9 @@ from trust_api.scrapping_tools.core.config import settings
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=1)
 def get_firestore_client() -> firestore.Client:
-    """Initialize and return Firestore client."""
+    """Initialize and return Firestore client (one shared client and gRPC channel per process)."""
     if settings.gcp_project_id:
         return firestore.Client(
             project=settings.gcp_project_id, database=settings.firestore_database
@@ -1479,6 +1482,149 @@ def retry_job_from_empty_result(doc_id: str) -> int:
     return new_retry_count
 
 
+# Attempts per write before a BulkWriter from create_bulk_writer reports it as failed
+BULK_WRITE_MAX_ATTEMPTS = 5
+
+
+def create_bulk_writer(client: firestore.Client, errors: dict[str, str]) -> BulkWriter:
+    """
+    Return a BulkWriter that retries each failed write up to BULK_WRITE_MAX_ATTEMPTS times.
+
+    Args:
+        client: Firestore client
+        errors: Filled with an error message per document ID whose write gave up
+    """
+
+    def on_write_error(failure, _bulk_writer) -> bool:
+        # Returning True retries the write (BulkWriter applies backoff)
+        if failure.attempts < BULK_WRITE_MAX_ATTEMPTS:
+            return True
+        errors[failure.operation.reference.id] = failure.message
+        return False
+
+    bulk_writer = client.bulk_writer()
+    bulk_writer.on_write_error(on_write_error)
+    return bulk_writer
+
+
+def reopen_jobs_bulk(
+    client: firestore.Client,
+    jobs_collection: firestore.CollectionReference,
+    posts_collection: firestore.CollectionReference,
+    retry_counts: dict[str, int],
+    post_doc_ids: dict[str, str],
+) -> dict[str, str]:
+    """
+    Move jobs to 'pending' with a BulkWriter and reopen their 'done' posts.
+
+    Each write is retried independently by the BulkWriter, so one failing document does
+    not affect the others. Posts are only moved from 'done' to 'noreplies' once their job
+    update has succeeded, as in retry_job_from_empty_result.
+
+    Args:
+        client: Firestore client
+        jobs_collection: Jobs collection reference
+        posts_collection: Posts collection reference
+        retry_counts: New retry_count per job doc_id to move to 'pending'
+        post_doc_ids: post_doc_id per job doc_id, for jobs that reference a post
+
+    Returns:
+        Error message per job doc_id whose update failed
+    """
+    now = datetime.now(timezone.utc)
+    write_errors: dict[str, str] = {}
+    bulk_writer = create_bulk_writer(client, write_errors)
+
+    for doc_id, retry_count in retry_counts.items():
+        bulk_writer.update(
+            jobs_collection.document(doc_id),
+            {
+                "status": "pending",
+                "retry_count": retry_count,
+                "updated_at": now,
+            },
+        )
+
+    # Job writes must land before their posts are reopened
+    bulk_writer.flush()
+    job_errors = dict(write_errors)
+
+    post_refs = [
+        posts_collection.document(post_doc_id)
+        for doc_id, post_doc_id in post_doc_ids.items()
+        if doc_id in retry_counts and doc_id not in job_errors
+    ]
+    if post_refs:
+        for post_doc in client.get_all(post_refs, field_paths=["status"]):
+            # Only update if post is in 'done' status (was successfully processed before)
+            if post_doc.exists and post_doc.get("status") == "done":
+                bulk_writer.update(post_doc.reference, {"status": "noreplies", "updated_at": now})
+
+    bulk_writer.close()
+
+    for post_doc_id, message in write_errors.items():
+        if post_doc_id not in job_errors:
+            logger.warning(f"Could not update post {post_doc_id} status during retry: {message}")
+
+    return job_errors
+
+
+def retry_jobs_from_empty_result_bulk(
+    doc_ids: list[str],
+) -> tuple[dict[str, int], dict[str, str]]:
+    """
+    Bulk version of retry_job_from_empty_result for mass reactivations.
+
+    Job documents are read with get_all() and updated through reopen_jobs_bulk, which
+    parallelizes the writes and backs off on contention, instead of one read/update
+    round-trip per job.
+
+    Args:
+        doc_ids: Firestore document IDs of the jobs to retry
+
+    Returns:
+        Tuple (retry_counts, errors): new retry_count per reactivated job doc_id, and
+        error message per job doc_id that could not be reactivated.
+    """
+    client = get_firestore_client()
+    jobs_collection = client.collection(settings.firestore_jobs_collection)
+    posts_collection = client.collection(settings.firestore_collection)
+
+    retry_counts: dict[str, int] = {}
+    errors: dict[str, str] = {}
+    post_doc_ids: dict[str, str] = {}
+
+    job_refs = [jobs_collection.document(doc_id) for doc_id in dict.fromkeys(doc_ids) if doc_id]
+    for doc in client.get_all(job_refs):
+        if not doc.exists:
+            errors[doc.id] = f"Job document {doc.id} does not exist"
+            continue
+        current_data = doc.to_dict()
+        current_status = current_data.get("status")
+        if current_status != "empty_result":
+            logger.warning(
+                f"Job {doc.id} is not in 'empty_result' status (current: {current_status}). "
+                f"Proceeding anyway, but this may not be a retry from empty_result."
+            )
+        retry_counts[doc.id] = current_data.get("retry_count", 0) + 1
+        if current_data.get("post_doc_id"):
+            post_doc_ids[doc.id] = current_data["post_doc_id"]
+
+    job_errors = reopen_jobs_bulk(
+        client, jobs_collection, posts_collection, retry_counts, post_doc_ids
+    )
+    for doc_id, message in job_errors.items():
+        errors[doc_id] = message
+        retry_counts.pop(doc_id, None)
+
+    logger.info(
+        f"Bulk retried {len(retry_counts)} jobs from empty_result ({len(errors)} errors). "
+        f"Status updated to 'pending'. Job documents reused (same job_id, same post_doc_id)."
+    )
+
+    return retry_counts, errors
+
+
 def query_empty_result_jobs(
     candidate_id: str | None = None,
     platform: str | None = None,
@@ -537,3 +537,77 @@ class TestUpdatePostStatus:
         call_args = mock_doc_ref.update.call_args[0][0]
         assert call_args["status"] == "done"
         assert "updated_at" in call_args
+
+
+class TestRetryJobsFromEmptyResultBulk:
+    """Tests for retry_jobs_from_empty_result_bulk function."""
+
+    @staticmethod
+    def _snapshot(doc_id, data):
+        snapshot = MagicMock()
+        snapshot.id = doc_id
+        snapshot.exists = data is not None
+        snapshot.to_dict.return_value = data
+        snapshot.get.side_effect = lambda field: data[field]
+        return snapshot
+
+    @patch("trust_api.scrapping_tools.services.get_firestore_client")
+    def test_bulk_retry_updates_jobs_and_done_posts(self, mock_get_client):
+        """Test that jobs are moved to pending and only 'done' posts are reopened."""
+        mock_client = MagicMock()
+        mock_bulk_writer = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.bulk_writer.return_value = mock_bulk_writer
+
+        job1 = self._snapshot("job1", {"status": "empty_result", "post_doc_id": "post1"})
+        job2 = self._snapshot(
+            "job2", {"status": "empty_result", "retry_count": 2, "post_doc_id": "post2"}
+        )
+        missing = self._snapshot("job3", None)
+        post1 = self._snapshot("post1", {"status": "done"})
+        post2 = self._snapshot("post2", {"status": "noreplies"})
+        mock_client.get_all.side_effect = [[job1, job2, missing], [post1, post2]]
+        references = {doc.id: doc.reference for doc in (job1, job2, missing, post1, post2)}
+        mock_client.collection.return_value.document.side_effect = references.get
+
+        retry_counts, errors = services.retry_jobs_from_empty_result_bulk(
+            ["job1", "job2", "job3", "job1"]
+        )
+
+        assert retry_counts == {"job1": 1, "job2": 3}
+        assert errors == {"job3": "Job document job3 does not exist"}
+
+        updates = {call.args[0]: call.args[1] for call in mock_bulk_writer.update.call_args_list}
+        assert updates[job1.reference]["status"] == "pending"
+        assert updates[job2.reference]["retry_count"] == 3
+        assert updates[post1.reference]["status"] == "noreplies"
+        assert post2.reference not in updates
+        mock_bulk_writer.flush.assert_called_once()
+        mock_bulk_writer.close.assert_called_once()
+
+    @patch("trust_api.scrapping_tools.services.get_firestore_client")
+    def test_bulk_retry_reports_failed_job_writes(self, mock_get_client):
+        """Test that a job write that gives up is reported and its post is not reopened."""
+        mock_client = MagicMock()
+        mock_bulk_writer = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.bulk_writer.return_value = mock_bulk_writer
+
+        job1 = self._snapshot("job1", {"status": "empty_result", "post_doc_id": "post1"})
+        mock_client.get_all.side_effect = [[job1]]
+        mock_client.collection.return_value.document.side_effect = {"job1": job1.reference}.get
+
+        def fail_job_write():
+            on_write_error = mock_bulk_writer.on_write_error.call_args.args[0]
+            failure = MagicMock(attempts=services.BULK_WRITE_MAX_ATTEMPTS, message="aborted")
+            failure.operation.reference.id = "job1"
+            assert on_write_error(failure, mock_bulk_writer) is False
+
+        mock_bulk_writer.flush.side_effect = fail_job_write
+
+        retry_counts, errors = services.retry_jobs_from_empty_result_bulk(["job1"])
+
+        assert retry_counts == {}
+        assert errors == {"job1": "aborted"}
+        assert mock_client.get_all.call_count == 1
+        mock_bulk_writer.close.assert_called_once()
@@ -0,0 +1,64 @@
+"""Tests for the CSV column readers of the upload/update scripts."""
+
+import csv
+import io
+import os
+import sys
+
+sys.path.insert(0, os.path.join(os.path.dirname(__file__), "..", "scripts"))
+
+import update_processing_jobs
+import upload_to_firestore
+
+HEADER = "platform,post_id,replies_count,country,candidate_id,max_posts_replies,start_date,end_date"
+
+
+class TestReadCsvRows:
+    """Tests for upload_to_firestore.read_csv_rows."""
+
+    def read(self, text):
+        _, rows = upload_to_firestore.read_csv_rows(
+            io.StringIO(text), upload_to_firestore.CSV_COLUMNS
+        )
+        return [dict(zip(upload_to_firestore.CSV_COLUMNS, row)) for row in rows]
+
+    def test_short_row_is_padded(self):
+        """Test that missing values and columns read as ''."""
+        (row,) = self.read(f"{HEADER}\nx,1,2\n")
+        assert row["country"] == ""
+        assert row["created_at"] == ""
+        assert row["end_date"] == ""
+
+    def test_extra_fields_are_ignored(self):
+        """Test that fields beyond the header do not leak into missing columns."""
+        (row,) = self.read(f"{HEADER}\nx,1,2,ar,c,5,s,e,EXTRA\n")
+        assert row["created_at"] == ""
+        assert row["end_date"] == "e"
+
+    def test_skip_and_limit(self):
+        """Test that skip and limit count rows after blank lines are dropped."""
+        _, rows = upload_to_firestore.read_csv_rows(
+            io.StringIO(f"{HEADER}\nx,1\n\nx,2\nx,3\n"), upload_to_firestore.CSV_COLUMNS, 1, 1
+        )
+        assert [row[1] for row in rows] == ["2"]
+
+
+class TestIterColumns:
+    """Tests for update_processing_jobs.iter_columns."""
+
+    def read(self, text, columns=("post_id", "platform", "missing")):
+        reader = csv.reader(io.StringIO(text))
+        header = next(reader)
+        return list(update_processing_jobs.iter_columns(reader, header, columns))
+
+    def test_short_row_is_padded(self):
+        """Test that missing values and columns read as ''."""
+        assert self.read("post_id,platform\n1\n") == [("1", "", "")]
+
+    def test_extra_fields_are_ignored(self):
+        """Test that fields beyond the header do not leak into missing columns."""
+        assert self.read("post_id,platform\n1,x,EXTRA,MORE\n") == [("1", "x", "")]
+
+    def test_blank_lines_are_skipped(self):
+        """Test that blank lines yield no row."""
+        assert self.read("post_id,platform\n\n1,x\n") == [("1", "x", "")]